@@ -1,15 +1,9 @@
+import importlib
 import streamlit as st
 
 # import seaborn as sns
 # import matplotlib.pyplot as plt
 
-from utils.preprocess import load_data
-from utils.st_exploratory import run_eda
-from utils.st_feature_engineering import run_feature_engineering
-from utils.st_model_training import run_model_training
-from utils.st_model_evaluation import run_model_evaluation
-from utils.st_climate_text_analysis import run_climate_text_analysis
-
 
 # '''
 # root _____________
@@ -33,6 +27,39 @@ from utils.st_climate_text_analysis import run_climate_text_analysis
 # '''
 
 
+# Sections are imported on first selection, so a cold start only pays for
+# streamlit and the page being shown (matplotlib, sklearn and the text
+# models load with the section that needs them).
+# name -> (module, entry point, frame passed in: "active", "base" or None)
+PAGES = {
+    "EDA": ("utils.st_exploratory", "run_eda", "active"),
+    "Feature Engineering": ("utils.st_feature_engineering", "run_feature_engineering", "base"),
+    "Model Training": ("utils.st_model_training", "run_model_training", "active"),
+    "Model Evaluation": ("utils.st_model_evaluation", "run_model_evaluation", "active"),
+    "Prediction": ("utils.st_prediction", "run_prediction", "base"),
+    "Climate Text Analysis": ("utils.st_climate_text_analysis", "run_climate_text_analysis", None),
+}
+
+
+def load_page(name):
+    """Import a section's module and return its entry point."""
+    module_name, func_name, _ = PAGES[name]
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def page_data(source):
+    """Return the frame a section runs on: the session's latest engineered frame or the base frame."""
+    if source is None:
+        return None
+    from utils.dataset_manager import get_dataset_manager, get_session_id
+
+    # One base frame per process; each session sees its latest engineered frame
+    manager = get_dataset_manager()
+    if source == "base":
+        return manager.base
+    return manager.active(get_session_id())
+
+
 def main():
 
     # set page configuration
@@ -53,38 +80,16 @@ def main():
     # side bar
 
     st.sidebar.title("Navigation Page")
-    page = st.sidebar.radio(
-        "Navigate to",
-        [
-            "EDA",
-            "Feature Engineering",
-            "Model Training",
-            "Model Evaluation",
-            "Climate Text Analysis",
-        ],
-    )
-
-    # if 'df' not in st.session_state:
-    #     st.session_state.df = load_data()
-    
+    page = st.sidebar.radio("Navigate to", list(PAGES))
+
     with col1:
-        # df = st.session_state.df
-        df = load_data()
         try:
-            if page == "EDA":
-                run_eda(df)  # call EDA part
-
-            elif page == "Feature Engineering":
-                df = run_feature_engineering(df)
-
-            elif page == "Model Training":
-                run_model_training(df)
-
-            elif page == "Model Evaluation":
-                run_model_evaluation(df)
-
+            run_page = load_page(page)
+            source = PAGES[page][2]
+            if source is None:
+                run_page()
             else:
-                run_climate_text_analysis()
+                run_page(page_data(source))
 
         except Exception as e:
             st.error(f"An error occurred: {e}")
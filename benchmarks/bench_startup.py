@@ -0,0 +1,75 @@
+"""
+Cold-start import benchmark.
+
+Imports each module in a fresh interpreter with `-X importtime` and reports
+the cumulative import time, so a section that starts pulling heavy
+dependencies in at module level shows up as a regression.
+
+    python -m benchmarks.bench_startup --repeat 3
+    python -m benchmarks.bench_startup --budget-ms 1500   # exit 1 if exceeded
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# app.py itself, then each section in the order app.PAGES loads them
+DEFAULT_MODULES = [
+    "app",
+    "utils.st_exploratory",
+    "utils.st_feature_engineering",
+    "utils.st_model_training",
+    "utils.st_model_evaluation",
+    "utils.st_climate_text_analysis",
+    "utils.st_prediction",
+    "geopandas",
+]
+
+
+def import_time_us(module):
+    """Return the cumulative import time of `module` in a fresh interpreter (microseconds)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    # Lines look like "import time:   self [us] | cumulative | imported package"
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1])
+    raise RuntimeError(f"no import time reported for {module}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per module; the fastest is reported")
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if any module exceeds this")
+    args = parser.parse_args()
+
+    print(f"{'module':<36} {'import ms':>10}")
+    over_budget = []
+    for module in args.modules:
+        try:
+            best = min(import_time_us(module) for _ in range(args.repeat)) / 1000
+        except RuntimeError as e:
+            print(f"{module:<36} {'error':>10}  {e}")
+            continue
+        flag = ""
+        if args.budget_ms is not None and best > args.budget_ms:
+            over_budget.append(module)
+            flag = "  over budget"
+        print(f"{module:<36} {best:>10.1f}{flag}")
+
+    if over_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Micro-benchmark for the sentiment text normalizer.
+
+Compares the previous per-string regex + maketrans cleaning and the
+four-pass pandas `.str` chain against the shared single-pass normalizer on
+the `data/sentiment_data` corpus.
+
+    python -m benchmarks.bench_text_normalizer --repeat 200
+"""
+import argparse
+import re
+import string
+import timeit
+
+import pandas as pd
+
+from utils.climate_text_analysis import clean_texts, load_sentiment_data, normalize_text
+
+
+def legacy_clean_text(text):
+    text = str(text).lower()
+    text = re.sub(r"\d+", "", text)
+    text = text.translate(str.maketrans("", "", string.punctuation))
+    return text.strip()
+
+
+def legacy_str_chain(texts):
+    return (
+        texts.str.lower()
+        .str.replace(r"\d+", "", regex=True)
+        .str.translate(str.maketrans("", "", string.punctuation))
+        .str.strip()
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=100, help="Times the corpus is replicated")
+    parser.add_argument("--rounds", type=int, default=5, help="Timing rounds (best is reported)")
+    args = parser.parse_args(argv)
+
+    corpus = load_sentiment_data()["text"]
+    texts = pd.Series(pd.concat([corpus] * args.repeat, ignore_index=True), dtype=object)
+    text_list = texts.tolist()
+    n = len(texts)
+
+    # Both paths must produce identical output before timing means anything
+    assert clean_texts(texts).tolist() == legacy_str_chain(texts).tolist()
+    assert [normalize_text(t) for t in text_list] == [legacy_clean_text(t) for t in text_list]
+
+    cases = {
+        "legacy clean_text (per string)": lambda: [legacy_clean_text(t) for t in text_list],
+        "normalize_text (per string)": lambda: [normalize_text(t) for t in text_list],
+        "legacy .str chain (Series)": lambda: legacy_str_chain(texts),
+        "clean_texts (Series)": lambda: clean_texts(texts),
+    }
+    print(f"{n} texts")
+    for name, func in cases.items():
+        best = min(timeit.repeat(func, number=1, repeat=args.rounds))
+        print(f"{name:34s} {best * 1e3:9.1f} ms  {n / best / 1e6:7.2f} M texts/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Scaling benchmark for the climate-vulnerability spatial joins.
+
+Grows the glacier layer with random points inside Nepal's admin regions
+and times the indexed joins in `utils.vulnerability` against a per-region
+scan (one vectorized `within` test per region) as the layer grows.
+
+    python -m benchmarks.bench_vulnerability_join --sizes 100 1000 10000 100000
+"""
+import argparse
+import time
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from utils.vulnerability import (
+    ADMIN_REGIONS_PATH,
+    GLACIERS_PATH,
+    glaciers_per_region,
+    nearest_glacier,
+)
+
+
+def random_glaciers(regions, n, seed=0):
+    """Return `n` random glacier points within the regions' bounds, with synthetic attributes."""
+    rng = np.random.default_rng(seed)
+    minx, miny, maxx, maxy = regions.total_bounds
+    points = shapely.points(rng.uniform(minx, maxx, n), rng.uniform(miny, maxy, n))
+    return gpd.GeoDataFrame(
+        {'id': [f"GL{i:06d}" for i in range(n)], 'retreat_2020': rng.uniform(5, 25, n)},
+        geometry=points, crs=regions.crs,
+    )
+
+
+def scan_glaciers_per_region(regions, glaciers):
+    """Reference join: test every glacier against every region."""
+    return pd.Series([int(glaciers.within(region).sum()) for region in regions.geometry], index=regions.index)
+
+
+def best_time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    regions = gpd.read_file(ADMIN_REGIONS_PATH)
+    print(f"{len(regions)} regions, shipped glacier layer: {len(gpd.read_file(GLACIERS_PATH))} points")
+    print(f"{'glaciers':>10} {'indexed ms':>11} {'scan ms':>9} {'nearest ms':>11}")
+    for n in args.sizes:
+        glaciers = random_glaciers(regions, n)
+        indexed = glaciers_per_region(regions, glaciers)['glacier_count']
+        scanned = scan_glaciers_per_region(regions, glaciers)
+        assert (indexed.to_numpy() == scanned.to_numpy()).all(), "indexed join disagrees with the scan"
+
+        t_indexed = best_time(lambda: glaciers_per_region(regions, glaciers), args.repeat)
+        t_scan = best_time(lambda: scan_glaciers_per_region(regions, glaciers), args.repeat)
+        t_nearest = best_time(lambda: nearest_glacier(regions, glaciers), args.repeat)
+        print(f"{n:>10} {t_indexed * 1e3:>11.1f} {t_scan * 1e3:>9.1f} {t_nearest * 1e3:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
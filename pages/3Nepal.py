@@ -1,12 +1,9 @@
 import streamlit as st
-import matplotlib.pyplot as plt
-import seaborn as sns
-import geopandas as gpd
-import rasterio
+from utils.figure_cache import render_cached
+from utils.geo_service import get_local_units, get_admin_hierarchy, ADMIN_LEVELS
+from utils.raster_engine import available_rasters, compare_scenarios, raster_path, BASELINE_YEAR, PROJECTION_YEAR
 
-
-gdf = gpd.read_file("data/vector_data/local_unit.shp")
-# gdf.head()
+MAP_WIDTH_PX = 800
 
 st.header("We will look here at different datasets of Nepal for different locations")
 st.divider()
@@ -20,59 +17,91 @@ map_kind = st.selectbox(
 )
 
 
-if map_kind == "District":
-    fig, ax = plt.subplots(1, 1)
-    gdf.plot(
-        ax=ax,
-        column="DISTRICT",
-        cmap="coolwarm",
-        legend=False,
-        edgecolor="black",
-        figsize=(10, 6),
-    )
-    ax.set_axis_off()
-    plt.title("DISTRICTS OF NEPAL")
-    st.pyplot(fig)
-
-if map_kind == "Development Areas":
-    fig, ax = plt.subplots(1, 1)
-    gdf.plot(
-        ax=ax,
-        column="Type_GN",
-        cmap="coolwarm",
-        legend=True,
-        edgecolor="black",
-        figsize=(10, 6),
+# Plot settings for each map view
+MAP_VIEWS = {
+    "District": dict(column="DISTRICT", cmap="coolwarm", legend=False, edgecolor="black", title="DISTRICTS OF NEPAL"),
+    "Development Areas": dict(
+        column="Type_GN", cmap="coolwarm", legend=True, edgecolor="black", title="COUNTRY: NEPAL",
         legend_kwds={"loc": "upper left", "bbox_to_anchor": (1, 1)},
-    )
-    plt.title("COUNTRY: NEPAL")
-    ax.set_axis_off()
-    st.pyplot(fig)
+    ),
+    "Rural Areas": dict(column="GaPa_NaPa", cmap="coolwarm", legend=False, edgecolor="black", title="DISTRICTS OF NEPAL"),
+    "States": dict(column="STATE_CODE", cmap="Set2", legend=False, edgecolor="None", title="DISTRICTS OF NEPAL"),
+}
+
+# Coarse views draw the pre-dissolved admin regions instead of every local unit
+ADMIN_VIEWS = {"District": "district", "States": "state"}
+
+
+def load_layer(map_kind):
+    """Return the GeoLayer a view draws: dissolved regions or local units."""
+    if map_kind in ADMIN_VIEWS:
+        return get_admin_hierarchy().level(ADMIN_VIEWS[map_kind])
+    return get_local_units()
+
 
-if map_kind == "Rural Areas":
+def draw_map(layer, level, view):
+    import matplotlib.pyplot as plt
+
+    options = dict(view)
+    title = options.pop("title")
+    gdf = layer.layer(level)
     fig, ax = plt.subplots(1, 1)
-    gdf.plot(
-        ax=ax,
-        column="GaPa_NaPa",
-        cmap="coolwarm",
-        legend=False,
-        edgecolor="black",
-        figsize=(10, 6),
-    )
+    gdf.plot(ax=ax, figsize=(10, 6), **options)
     ax.set_axis_off()
-    plt.title("DISTRICTS OF NEPAL")
-    st.pyplot(fig)
+    ax.set_title(title)
+    return fig
+
+
+if map_kind is not None:
+    try:
+        # Loaded once per process from GeoParquet, with simplified geometries
+        layer = load_layer(map_kind)
+    except FileNotFoundError as e:
+        st.error(str(e))
+    else:
+        # The rendered map only changes when the layer's files do
+        level = layer.level_for(MAP_WIDTH_PX)
+        key = ("nepal_map", repr(sorted(layer.stamp.items())), level, map_kind)
+        png = render_cached(key, lambda: draw_map(layer, level, MAP_VIEWS[map_kind]))
+        st.image(png, use_container_width=True)
 
-if map_kind == "States":
+
+# --- Baseline (2020) vs projection (2050) climate rasters ---
+st.divider()
+st.subheader("Climate Scenarios: 2020 vs 2050")
+
+
+def draw_scenario_map(layer, level, table, title):
+    import matplotlib.pyplot as plt
+
+    gdf = layer.layer(level).assign(change=table["change"].to_numpy())
     fig, ax = plt.subplots(1, 1)
-    gdf.plot(
-        ax=ax,
-        column="STATE_CODE",
-        cmap="Set2",
-        legend=False,
-        edgecolor="None",
-        figsize=(10, 6)
-    )
+    gdf.plot(ax=ax, column="change", cmap="RdYlBu_r", legend=True, edgecolor="black", linewidth=0.3,
+             missing_kwds={"color": "lightgrey"})
     ax.set_axis_off()
-    plt.title("DISTRICTS OF NEPAL")
-    st.pyplot(fig)
\ No newline at end of file
+    ax.set_title(title)
+    return fig
+
+rasters = available_rasters()
+pairs = sorted({(v, m) for v, y, m in rasters if y == BASELINE_YEAR}
+               & {(v, m) for v, y, m in rasters if y == PROJECTION_YEAR}, key=lambda p: (p[0], p[1] or 0))
+if not pairs:
+    st.info("No scenario rasters found in data/raster_data (expected e.g. temperature_2020_01.tif and temperature_2050_01.tif).")
+else:
+    variable = st.selectbox("Variable", sorted({v for v, _ in pairs}))
+    months = [m for v, m in pairs if v == variable]
+    month = st.selectbox("Month", months, format_func=lambda m: "Annual" if m is None else f"{m:02d}")
+    admin_level = st.selectbox("Aggregate by", list(ADMIN_LEVELS))
+    try:
+        regions = get_admin_hierarchy().level(admin_level)
+        key_col = ADMIN_LEVELS[admin_level][0]
+        # Zonal means come from cached tiles and precomputed region masks
+        table = compare_scenarios(variable, regions, month, key_col)
+        level = regions.level_for(MAP_WIDTH_PX)
+        versions = [raster_path(variable, y, month).stat().st_mtime_ns for y in (BASELINE_YEAR, PROJECTION_YEAR)]
+        key = ("scenario_map", repr(sorted(regions.stamp.items())), variable, month, admin_level, *versions, level)
+        title = f"{variable.title()} change {BASELINE_YEAR} \u2192 {PROJECTION_YEAR}"
+        st.image(render_cached(key, lambda: draw_scenario_map(regions, level, table, title)), use_container_width=True)
+        st.dataframe(table)
+    except FileNotFoundError as e:
+        st.error(str(e))
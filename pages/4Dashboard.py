@@ -1,87 +1,39 @@
+import time
 import streamlit as st
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
-import os
+from utils.feedback_store import SENTIMENT_COLUMN, get_feedback_store
+from utils.sentiment_labels import SENTIMENT_LABELS
 
 st.title("Dashboard")
 st.divider()
 
-# --- Google Sheets Configuration (same as in 1Feedback.py) ---
-GOOGLE_SHEET_NAME = "Feedback_Capstone"  
-GOOGLE_SHEET_WORKSHEET_NAME = "Sheet1"     
-LOCAL_GOOGLE_CREDENTIALS_PATH = "google_credentials.json"
+# Both tabs read the local replica kept in sync by the feedback store's
+# background thread; filters and counts are SQLite queries on indexed columns
+store = get_feedback_store()
 
-def get_gspread_client():
-    """Authenticates with Google Sheets API and returns a gspread client."""
-    scopes = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
-    client = None # Initialize client to None
 
-    try:
-        if hasattr(st, 'secrets') and st.secrets:
-            creds_dict = st.secrets.get("gcp_service_account") # Use .get() for safer access
-            if creds_dict:
-                print(f"DEBUG: Attempting to use st.secrets['gcp_service_account']. Type: {type(creds_dict)}")
-                client = gspread.service_account_from_dict(creds_dict, scopes=scopes)
-                print("DEBUG: Client initialized from st.secrets.")
-            else:
-                print("DEBUG: 'gcp_service_account' key not found in st.secrets.")
-        else:
-            print("DEBUG: st.secrets not available or empty, assuming local development or misconfiguration.")
-            
-    except Exception as e: # Catch any error during secrets processing or gspread init
-        print(f"DEBUG: Error initializing client from st.secrets: {e}. Will try local file.")
-        client = None # Ensure client is None if secrets method failed
+@st.fragment(run_every=1.0)
+def show_sync_progress():
+    """Poll the background sync and reload the page once it has finished."""
+    if store.syncing:
+        st.caption("Syncing feedback in the background...")
+    else:
+        st.rerun()
 
-    # Fallback to local JSON file (for local development)
-    if client is None: # Only try local file if client wasn't initialized from secrets
-        if os.path.exists(LOCAL_GOOGLE_CREDENTIALS_PATH):
-            print(f"DEBUG: Found local credentials at: {os.path.abspath(LOCAL_GOOGLE_CREDENTIALS_PATH)}")
-            try:
-                client = gspread.service_account(filename=LOCAL_GOOGLE_CREDENTIALS_PATH, scopes=scopes)
-                print("DEBUG: Client initialized from local file.")
-            except Exception as e:
-                print(f"DEBUG: Error initializing client from local file {LOCAL_GOOGLE_CREDENTIALS_PATH}: {e}")
-                st.error(f"Failed to initialize Google Sheets client from local file: {e}")
-                return None
-        else:
-            # This error will be shown if neither secrets nor local file worked
-            st.error("Google Sheets credentials not found. Please configure them for deployment in .streamlit/secrets.toml or ensure 'google_credentials.json' is in the project root for local development.")
-            return None
-    
-    # If client is still None here, it means both methods failed.
-    if client is None:
-        st.error("Failed to initialize Google Sheets client through any method.")
-        return None
-        
-    return client
 
-
-@st.cache_data(ttl=600) # Cache data
-def read_all_feedback_data(_client, sheet_name, worksheet_name, refresh_trigger=None) -> pd.DataFrame | None:
-    """Reads all data from the specified Google Sheet worksheet and returns a DataFrame."""
-    if not _client:
-        return None
-    try:
-        sheet = _client.open(sheet_name).worksheet(worksheet_name)
-        data = sheet.get_all_records()  
-        if not data:
-            return pd.DataFrame() #
-        df = pd.DataFrame(data)
-        if 'Rating' in df.columns:
-            df['Rating'] = pd.to_numeric(df['Rating'], errors='coerce')
-        return df 
-    except gspread.exceptions.SpreadsheetNotFound:
-        st.error(f"Spreadsheet '{sheet_name}' not found. Please check the name and sharing permissions.")
-        return None
-    except gspread.exceptions.WorksheetNotFound:
-        st.error(f"Worksheet '{worksheet_name}' not found in '{sheet_name}'.")
-        return None
-    except Exception as e:
-        st.error(f"Failed to read data from Google Sheet: {e}")
-        return None
+# The sync itself runs on the store's background thread, never on this one
+if st.button("Sync now"):
+    store.request_sync()
+if store.syncing:
+    show_sync_progress()
+elif store.last_sync:
+    st.caption(f"Last synced {time.time() - store.last_sync:.0f}s ago.")
+if store.last_error:
+    st.warning(f"Feedback backend unavailable, retrying in the background: {store.last_error}")
+if store.sentiment_error:
+    st.info(f"Feedback sentiment is not scored yet: {store.sentiment_error}")
 
 # Create tabs
 tab1, tab2 = st.tabs(["👨‍🏫 Feedback", "📊 Ratings"])
@@ -95,56 +47,54 @@ with tab1:
        options,
        index=0 # Default to "All Feedback"
    )
+   sentiment_options = {"All Sentiments": None, **{name: label for label, name in SENTIMENT_LABELS.items()}}
+   sentiment_option = st.selectbox("Filter by sentiment:", list(sentiment_options))
+   sentiment = sentiment_options[sentiment_option]
 
-   g_client = get_gspread_client()
-   if g_client:
-       last_submission_time = st.session_state.get("last_feedback_submission_time", 0)
-       feedback_df = read_all_feedback_data(
-           g_client, GOOGLE_SHEET_NAME, GOOGLE_SHEET_WORKSHEET_NAME,
-           refresh_trigger=last_submission_time
-       )
-       
-       if feedback_df is not None:
-           if not feedback_df.empty:
-                display_df = feedback_df.copy() 
-
-                if 'Rating' not in display_df.columns:
-                    st.warning("The 'Rating' column is missing from the feedback data. Cannot filter by rating.")
-                elif filter_option == options[1]: # Positive Ratings
-                    display_df = display_df[display_df['Rating'] > 5]
-                elif filter_option == options[2]: # Negative Ratings
-                    display_df = display_df[display_df['Rating'] <= 5]
+   if filter_option == options[1]: # Positive Ratings
+       display_df = store.query(rating_gt=5, sentiment=sentiment)
+   elif filter_option == options[2]: # Negative Ratings
+       display_df = store.query(rating_le=5, sentiment=sentiment)
+   else:
+       display_df = store.query(sentiment=sentiment)
 
-                if not display_df.empty:
-                    st.dataframe(display_df)
-                else:
-                    st.info(f"No feedback entries found for the selected filter: '{filter_option}'.")
-           else:
-               st.info("No feedback data found in the sheet yet.")
+   if not display_df.empty:
+       display_df[SENTIMENT_COLUMN] = display_df[SENTIMENT_COLUMN].map(SENTIMENT_LABELS)
+       st.dataframe(display_df)
+   elif filter_option == options[0]:
+       st.info("No feedback data found in the sheet yet.")
+   else:
+       st.info(f"No feedback entries found for the selected filter: '{filter_option}'.")
 
 
 with tab2:
    st.header("Feedback Ratings Distribution")
    
-   g_client_tab2 = get_gspread_client()
-   if g_client_tab2:
-       last_submission_time_tab2 = st.session_state.get("last_feedback_submission_time", 0)
-       feedback_df_tab2 = read_all_feedback_data(
-           g_client_tab2, GOOGLE_SHEET_NAME, GOOGLE_SHEET_WORKSHEET_NAME,
-           refresh_trigger=last_submission_time_tab2
-       )
+   # Histogram and per-day sums are maintained incrementally by the store
+   rating_counts = store.rating_counts()
+   if not rating_counts.empty:
+       ratings = rating_counts.index.to_numpy(dtype=float)
+       col1, col2, col3 = st.columns(3)
+       col1.metric("Average Rating", f"{(ratings * rating_counts).sum() / rating_counts.sum():.2f}")
+       col2.metric("Positive Ratings (> 5)", int(rating_counts[ratings > 5].sum()))
+       col3.metric("Negative Ratings (<= 5)", int(rating_counts[ratings <= 5].sum()))
+
+       fig, ax = plt.subplots()
+       ax.pie(rating_counts, labels=rating_counts.index, autopct='%1.1f%%', startangle=90)
+       ax.axis('equal')  
+       st.pyplot(fig)
+
+       # Scored in the background by the store as rows are synced
+       sentiment_stats = store.sentiment_stats()
+       if not sentiment_stats.empty:
+           st.subheader("Ratings by Sentiment")
+           sentiment_stats.index = sentiment_stats.index.map(SENTIMENT_LABELS)
+           st.dataframe(sentiment_stats.rename(columns={'count': "Feedback", 'avg_rating': "Average Rating"}))
 
-       if feedback_df_tab2 is not None and not feedback_df_tab2.empty:
-           if 'Rating' in feedback_df_tab2.columns:
-               rating_counts = feedback_df_tab2['Rating'].value_counts().sort_index()
-               if not rating_counts.empty:
-                   fig, ax = plt.subplots()
-                   ax.pie(rating_counts, labels=rating_counts.index, autopct='%1.1f%%', startangle=90)
-                   ax.axis('equal')  
-                   st.pyplot(fig)
-               else:
-                   st.info("No ratings available to display in the pie chart.")
-           else:
-               st.warning("The 'Rating' column is missing from the feedback data.")
-       elif feedback_df_tab2 is not None and feedback_df_tab2.empty:
-            st.info("No feedback data found in the sheet yet to display ratings.")
\ No newline at end of file
+       st.subheader("Ratings Over Time")
+       window = st.selectbox("Rolling window (days)", [7, 30, 90])
+       st.line_chart(store.rolling_average(window))
+       period = st.radio("Feedback count per", ["Week", "Month"], horizontal=True)
+       st.bar_chart(store.period_counts('W' if period == "Week" else 'M'))
+   else:
+       st.info("No feedback data found in the sheet yet to display ratings.")
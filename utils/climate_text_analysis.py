@@ -1,23 +1,58 @@
 import os
+import copy
+import zlib
 import pandas as pd
-import joblib
 import string
 import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import Tuple, Dict, Any, List
+from typing import Tuple, Dict, Any, List, Optional, Iterable, Iterator, Sequence
 
 from sklearn.model_selection import train_test_split
 from sklearn.pipeline import Pipeline
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.metrics import classification_report, accuracy_score
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer
+
+from utils.job_queue import report_progress
+from utils.sentiment_labels import SENTIMENT_LABELS
+from utils.model_registry import (
+    register_model,
+    load_model as registry_load_model,
+    load_artifact,
+    latest_version,
+    artifact_path,
+)
 
 DATA_DIR_NAME = "data"
 SENTIMENT_DATA_SUBDIR = "sentiment_data"
 POSITIVE_CSV = "positive.csv"
 NEGATIVE_CSV = "negative.csv"
-MODELS_DIR_NAME = "models"
 DEFAULT_MODEL_FILENAME = "sentiment_model.pkl"
+MODEL_CHECK_INTERVAL = 1.0  # seconds between checks for a newer model on disk
+DEFAULT_BATCH_SIZE = 1000
+
+# Online (hashing) training mode
+HASHING_N_FEATURES = 2 ** 18
+ONLINE_CHUNK_SIZE = 500
+HOLDOUT_MODULUS = 5  # about 20% of rows are held out for evaluation
+MAX_HOLDOUT_ROWS = 50_000
+SENTIMENT_CLASSES = [0, 1]
+
+
+def _sentiment_data_paths() -> Tuple[Path, Path]:
+    """Return the paths of the positive and negative sentiment CSVs."""
+    try:
+        base_dir = Path(__file__).resolve().parent
+    except NameError:
+        base_dir = Path.cwd()  # Fallback for interactive use
+
+    sentiment_data_path = base_dir.parent / DATA_DIR_NAME / SENTIMENT_DATA_SUBDIR
+    return sentiment_data_path / POSITIVE_CSV, sentiment_data_path / NEGATIVE_CSV
 
 
 def load_sentiment_data() -> pd.DataFrame:
@@ -26,14 +61,7 @@ def load_sentiment_data() -> pd.DataFrame:
     Assumes CSVs have a header and a 'Word' column for the text.
     Returns a combined DataFrame with text and corresponding labels.
     """
-    try:
-        base_dir = Path(__file__).resolve().parent
-    except NameError:
-        base_dir = Path.cwd()  # Fallback for interactive use
-    
-    sentiment_data_path = base_dir.parent / DATA_DIR_NAME / SENTIMENT_DATA_SUBDIR
-    pos_path = sentiment_data_path / POSITIVE_CSV
-    neg_path = sentiment_data_path / NEGATIVE_CSV
+    pos_path, neg_path = _sentiment_data_paths()
 
     try:
         pos_df_raw = pd.read_csv(pos_path)
@@ -66,28 +94,45 @@ def load_sentiment_data() -> pd.DataFrame:
     return df
 
 
+# Built once at import: ASCII uppercase -> lowercase, digits and punctuation deleted.
+# ASCII text (the common case) is normalized in a single translate pass.
+_NORMALIZE_TABLE = str.maketrans(
+    string.ascii_uppercase, string.ascii_lowercase, string.digits + string.punctuation
+)
+_DIGITS_RE = re.compile(r"\d+")
+
+
+def normalize_text(text: Any) -> str:
+    """
+    Lowercase text and strip digits, punctuation and surrounding whitespace.
+    Shared by training and inference so both always clean text identically.
+    """
+    text = str(text)
+    if not text.isascii():
+        # Non-ASCII letters and digits (e.g. Devanagari) need the full rules
+        text = _DIGITS_RE.sub("", text.lower())
+    return text.translate(_NORMALIZE_TABLE).strip()
+
+
 def clean_text(text: str) -> str:
     """
     Preprocess text by removing punctuation, numbers, and converting to lowercase.
     """
-    text = str(text).lower() # Ensure input is string
-    text = re.sub(r"\d+", "", text) # Remove numbers
-    text = text.translate(str.maketrans("", "", string.punctuation))
-    text = text.strip()
-    return text
+    return normalize_text(text)
+
+
+def clean_texts(texts: pd.Series) -> pd.Series:
+    """
+    Vectorized version of `clean_text` for a Series of texts.
+    """
+    return texts.map(normalize_text)
 
 
 def preprocess_data(df):
     """
-    Apply text cleaning to the DataFrame using vectorized string operations for better performance.
+    Apply text cleaning to the DataFrame using the shared single-pass normalizer.
     """
-    df["clean_text"] = ( # type: ignore
-        df["text"]
-        .str.lower()
-        .str.replace(r"\d+", "", regex=True)
-        .str.translate(str.maketrans("", "", string.punctuation))
-        .str.strip()
-    )
+    df["clean_text"] = clean_texts(df["text"]) # type: ignore
     return df
 
 
@@ -124,29 +169,343 @@ def train_sentiment_model(df: pd.DataFrame) -> Tuple[Pipeline, Dict[str, Any], f
     return pipeline, report, accuracy
 
 
-def save_model(model: Pipeline, filename: str = DEFAULT_MODEL_FILENAME) -> None:
+def make_online_pipeline() -> Pipeline:
     """
-    Save the trained model to disk.
+    Build an untrained hashing + SGD pipeline for online training.
+    The hashing vectorizer is stateless, so the model size is fixed by
+    HASHING_N_FEATURES no matter how much text it has seen.
     """
+    return Pipeline(
+        [
+            (
+                "hash",
+                HashingVectorizer(
+                    stop_words="english",
+                    ngram_range=(1, 2),
+                    n_features=HASHING_N_FEATURES,
+                    alternate_sign=False,
+                ),
+            ),
+            (
+                "clf",
+                SGDClassifier(loss="log_loss", random_state=42),
+            ),
+        ]
+    )
+
+
+def is_online_model(model: Pipeline) -> bool:
+    """Return True if the pipeline can be updated with `partial_fit_sentiment_model`."""
+    return "hash" in model.named_steps and hasattr(model.named_steps["clf"], "partial_fit")
+
+
+def iter_sentiment_chunks(chunksize: int = ONLINE_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Stream the positive and negative CSVs in interleaved, preprocessed chunks
+    with `text`, `label` and `clean_text` columns.
+    """
+    pos_path, neg_path = _sentiment_data_paths()
+    sources = [
+        (pd.read_csv(pos_path, usecols=["Word"], chunksize=chunksize), 1),
+        (pd.read_csv(neg_path, usecols=["Word"], chunksize=chunksize), 0),
+    ]
+    while sources:
+        for source in list(sources):
+            reader, label = source
+            chunk = next(reader, None)
+            if chunk is None:
+                sources.remove(source)
+                continue
+            chunk = chunk.rename(columns={"Word": "text"}).dropna(subset=["text"])
+            chunk["text"] = chunk["text"].astype(str)
+            chunk["label"] = label
+            yield preprocess_data(chunk)
+
+
+def _holdout_mask(texts: pd.Series) -> pd.Series:
+    """Deterministically route about 1 in HOLDOUT_MODULUS texts to evaluation."""
+    return texts.map(lambda t: zlib.crc32(t.encode("utf-8")) % HOLDOUT_MODULUS == 0)
+
+
+def partial_fit_sentiment_model(model: Pipeline, df: pd.DataFrame) -> Pipeline:
+    """
+    Update an online pipeline in place with preprocessed, labelled rows.
+    """
+    features = model.named_steps["hash"].transform(df["clean_text"])
+    model.named_steps["clf"].partial_fit(features, df["label"], classes=SENTIMENT_CLASSES)
+    return model
+
+
+def train_online_sentiment_model(
+    chunks: Optional[Iterable[pd.DataFrame]] = None,
+    model: Optional[Pipeline] = None,
+) -> Tuple[Pipeline, Dict[str, Any], float]:
+    """
+    Train (or continue training) a hashing + SGD model chunk by chunk.
+    Reads the sentiment CSVs in chunks when `chunks` is not given. A stable
+    hash-based holdout is kept aside for the returned evaluation report.
+    """
+    if chunks is None:
+        chunks = iter_sentiment_chunks()
+    if model is None:
+        model = make_online_pipeline()
+
+    holdout = []
+    holdout_rows = 0
+    for chunk in chunks:
+        mask = _holdout_mask(chunk["clean_text"])
+        train_rows = chunk[~mask]
+        if not train_rows.empty:
+            partial_fit_sentiment_model(model, train_rows)
+        if holdout_rows < MAX_HOLDOUT_ROWS and mask.any():
+            holdout.append(chunk.loc[mask, ["clean_text", "label"]])
+            holdout_rows += int(mask.sum())
+
+    if not hasattr(model.named_steps["clf"], "coef_"):
+        raise ValueError("No sentiment data was available for online training.")
+    if not holdout:
+        return model, {}, float("nan")
+
+    test_df = pd.concat(holdout, ignore_index=True)
+    y_pred = model.predict(test_df["clean_text"])
+    report = classification_report(test_df["label"], y_pred, output_dict=True, zero_division=0)
+    accuracy = accuracy_score(test_df["label"], y_pred)
+    return model, report, accuracy
+
+
+def update_sentiment_model(
+    texts: List[str],
+    labels: List[int],
+    filename: str = DEFAULT_MODEL_FILENAME,
+) -> Dict[str, Any]:
+    """
+    Fold newly labelled texts into the latest online model and save the
+    result as a new version. Returns the new version's manifest.
+    """
+    model = load_model(filename)
+    if not is_online_model(model):
+        raise ValueError("The saved sentiment model was trained in batch (TF-IDF) mode and cannot be updated incrementally.")
+
+    # The loaded model is shared through the registry cache; update a copy
+    model = copy.deepcopy(model)
+    df = preprocess_data(pd.DataFrame({"text": [str(t) for t in texts], "label": labels}))
+    partial_fit_sentiment_model(model, df)
+    return save_model(model, filename, extra={"mode": "online", "updated_rows": len(df)})
+
+
+def train_and_save_sentiment_model(df: Optional[pd.DataFrame] = None, mode: str = "batch") -> Dict[str, Any]:
+    """
+    Train a sentiment model and save it as a new registry version.
+    Meant to run as a background job; returns the report and manifest.
+    """
+    report_progress(0.1, "training")
+    if mode == "online":
+        model, report, _ = train_online_sentiment_model()
+    else:
+        if df is None:
+            raise ValueError("Batch training needs the preprocessed sentiment data.")
+        model, report, _ = train_sentiment_model(df)
+    report_progress(0.9, "saving")
+    manifest = save_model(model, metrics={"accuracy": report.get("accuracy")})
+    return {"report": report, "manifest": manifest}
+
+
+def _registry_name(filename: str) -> str:
+    """Map a legacy model filename (e.g. 'sentiment_model.pkl') to a registry name."""
+    return Path(filename).stem
+
+
+def save_model(
+    model: Pipeline,
+    filename: str = DEFAULT_MODEL_FILENAME,
+    metrics: Optional[Dict[str, Any]] = None,
+    extra: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Save the trained model to disk as a new registry version.
+    Returns the version's manifest.
+    """
+    if extra is None:
+        extra = {"mode": "online" if is_online_model(model) else "batch"}
     try:
-        base_dir = Path(__file__).resolve().parent
-    except NameError:
-        base_dir = Path.cwd()
-    model_path = base_dir.parent / MODELS_DIR_NAME / filename
-    try:
-        model_path.parent.mkdir(parents=True, exist_ok=True)
-        joblib.dump(model, model_path)
+        return register_model(
+            model,
+            _registry_name(filename),
+            features=["clean_text"],
+            target="label",
+            metrics=metrics,
+            extra=extra,
+        )
     except Exception as e:
-        raise IOError(f"Failed to save model to {model_path}: {e}")
+        raise IOError(f"Failed to save model '{filename}': {e}")
 
 
 def load_model(filename: str = DEFAULT_MODEL_FILENAME) -> Pipeline:
     """
-    Load the trained model from disk.
+    Load the latest trained model from disk.
     """
-    try:
-        base_dir = Path(__file__).resolve().parent
-    except NameError:
-        base_dir = Path.cwd()
-    model_path = base_dir.parent / MODELS_DIR_NAME / filename
-    return joblib.load(model_path)
+    return registry_load_model(_registry_name(filename))
+
+
+class SentimentPredictor:
+    """
+    Process-wide holder of the sentiment model, safe to share across threads.
+
+    The model is loaded once and only reloaded when the latest artifact on
+    disk changes (new version, mtime or size). The disk check itself runs at
+    most once every `check_interval` seconds, so predictions don't pay for I/O.
+    """
+
+    def __init__(self, filename: str = DEFAULT_MODEL_FILENAME, check_interval: float = MODEL_CHECK_INTERVAL):
+        self.name = _registry_name(filename)
+        self.check_interval = check_interval
+        self._model: Optional[Pipeline] = None
+        self._stamp: Optional[Tuple[int, int, int]] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _disk_stamp(self) -> Tuple[int, int, int]:
+        version = latest_version(self.name)
+        if version is None:
+            raise FileNotFoundError(f"Sentiment model '{self.name}' has not been trained yet.")
+        stat = os.stat(artifact_path(self.name, version))
+        return version, stat.st_mtime_ns, stat.st_size
+
+    def invalidate(self) -> None:
+        """Force a disk check on the next prediction (e.g. after retraining)."""
+        self._checked_at = 0.0
+
+    @property
+    def model(self) -> Pipeline:
+        now = time.monotonic()
+        if self._model is not None and now - self._checked_at < self.check_interval:
+            return self._model
+        with self._lock:
+            if self._model is None or now - self._checked_at >= self.check_interval:
+                stamp = self._disk_stamp()
+                if stamp != self._stamp:
+                    self._model = load_artifact(self.name, stamp[0])[0]
+                    self._stamp = stamp
+                self._checked_at = now
+            return self._model
+
+    @property
+    def version(self) -> Optional[int]:
+        return self._stamp[0] if self._stamp else None
+
+    def predict(self, texts: List[str]) -> List[int]:
+        """Predict sentiment labels for raw (uncleaned) texts."""
+        return self.model.predict([clean_text(t) for t in texts]).tolist()
+
+
+_predictors: Dict[str, SentimentPredictor] = {}
+_predictors_lock = threading.Lock()
+
+
+def get_sentiment_predictor(filename: str = DEFAULT_MODEL_FILENAME) -> SentimentPredictor:
+    """Return the shared predictor for a model file."""
+    with _predictors_lock:
+        if filename not in _predictors:
+            _predictors[filename] = SentimentPredictor(filename)
+        return _predictors[filename]
+
+
+def score_texts(model: Pipeline, texts: Sequence[str]) -> pd.DataFrame:
+    """
+    Clean and score one chunk of raw texts.
+    Returns a DataFrame with the predicted `label` and one `proba_<class>`
+    column per class.
+    """
+    cleaned = clean_texts(pd.Series(list(texts), dtype=object))
+    result = pd.DataFrame({"label": model.predict(cleaned)})
+    if hasattr(model, "predict_proba"):
+        proba = model.predict_proba(cleaned)
+        for i, cls in enumerate(model.classes_):
+            result[f"proba_{cls}"] = proba[:, i]
+    return result
+
+
+# Model loaded once per pool worker by `_init_worker`
+_worker_model: Optional[Pipeline] = None
+
+
+def _init_worker(filename: str) -> None:
+    global _worker_model
+    _worker_model = load_model(filename)
+
+
+def _score_in_worker(texts: Sequence[str]) -> pd.DataFrame:
+    return score_texts(_worker_model, texts)
+
+
+def iter_chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Yield successive lists of at most `size` items."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def score_chunks(
+    chunks: Iterable[Sequence[str]],
+    filename: str = DEFAULT_MODEL_FILENAME,
+    n_jobs: int = 1,
+) -> Iterator[pd.DataFrame]:
+    """
+    Score an iterable of text chunks, yielding one result frame per chunk in
+    input order. With `n_jobs > 1` chunks are fanned out over a process pool;
+    at most `2 * n_jobs` chunks are in flight, so memory stays bounded.
+    """
+    if n_jobs <= 1:
+        predictor = get_sentiment_predictor(filename)
+        for chunk in chunks:
+            yield score_texts(predictor.model, chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(filename,)) as pool:
+        pending: deque = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_score_in_worker, list(chunk)))
+            if len(pending) >= 2 * n_jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def predict_stream(
+    texts: Iterable[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    filename: str = DEFAULT_MODEL_FILENAME,
+    n_jobs: int = 1,
+) -> Iterator[pd.DataFrame]:
+    """
+    Lazily score an iterable of raw texts in chunks of `batch_size`.
+    Yields result frames (with the original `text`) as chunks complete.
+    """
+    text_chunks = deque()
+
+    def remember(chunks):
+        for chunk in chunks:
+            text_chunks.append(chunk)
+            yield chunk
+
+    for result in score_chunks(remember(iter_chunks(texts, batch_size)), filename, n_jobs):
+        result.insert(0, "text", text_chunks.popleft())
+        yield result
+
+
+def predict_batch(
+    texts: Iterable[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    filename: str = DEFAULT_MODEL_FILENAME,
+    n_jobs: int = 1,
+) -> pd.DataFrame:
+    """
+    Score a collection of raw texts and return all results in one DataFrame.
+    """
+    results = list(predict_stream(texts, batch_size, filename, n_jobs))
+    if not results:
+        return pd.DataFrame(columns=["text", "label"])
+    return pd.concat(results, ignore_index=True)
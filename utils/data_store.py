@@ -0,0 +1,102 @@
+import os
+import json
+import uuid
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+
+# Columnar copy of the processed CSV. The CSV stays the source of truth; the
+# Parquet file is rebuilt whenever the CSV changes (size or mtime differ).
+ROW_GROUP_SIZE = 64_000
+YEAR_COL = 'year'
+_STAMP_KEY = b'source_stamp'
+
+
+def source_stamp(csv_path):
+    """Return a small fingerprint of the source file used to detect changes."""
+    stat = os.stat(csv_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def store_path_for(csv_path):
+    """Return the location of the columnar copy of a CSV file."""
+    root, _ = os.path.splitext(csv_path)
+    return root + '.parquet'
+
+
+def _read_stamp(parquet_path):
+    """Read the source stamp stored in the Parquet schema metadata."""
+    try:
+        metadata = pq.read_schema(parquet_path).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    raw = metadata.get(_STAMP_KEY)
+    return json.loads(raw) if raw else None
+
+
+def build_store(csv_path, parquet_path=None):
+    """
+    Convert the CSV into a typed Parquet file sorted by year.
+
+    Sorting by year keeps each row group's min/max statistics tight, so
+    year filters can skip whole row groups without decoding them.
+    """
+    parquet_path = parquet_path or store_path_for(csv_path)
+    table = pv.read_csv(csv_path)
+    if YEAR_COL in table.column_names:
+        table = table.set_column(
+            table.column_names.index(YEAR_COL), YEAR_COL,
+            table[YEAR_COL].cast(pa.int64()),
+        )
+        table = table.sort_by(YEAR_COL)
+
+    metadata = dict(table.schema.metadata or {})
+    metadata[_STAMP_KEY] = json.dumps(source_stamp(csv_path)).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    # Write to a temp file first so concurrent readers never see a partial file
+    # (unique per build: sessions of one process may rebuild concurrently)
+    tmp_path = f"{parquet_path}.{uuid.uuid4().hex}.tmp"
+    pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_SIZE)
+    os.replace(tmp_path, parquet_path)
+    return parquet_path
+
+
+def ensure_store(csv_path):
+    """Return the Parquet path for a CSV, (re)building it if it is stale."""
+    parquet_path = store_path_for(csv_path)
+    if _read_stamp(parquet_path) != source_stamp(csv_path):
+        build_store(csv_path, parquet_path)
+    return parquet_path
+
+
+def year_filters(year_range):
+    """Translate an inclusive (start, end) year range into Parquet filters."""
+    if year_range is None:
+        return None
+    start, end = year_range
+    filters = []
+    if start is not None:
+        filters.append((YEAR_COL, '>=', int(start)))
+    if end is not None:
+        filters.append((YEAR_COL, '<=', int(end)))
+    return filters or None
+
+
+def read_store(csv_path, columns=None, year_range=None):
+    """
+    Read the columnar store for a CSV as a DataFrame.
+
+    Only the requested columns are decoded and row groups outside
+    `year_range` are skipped using the Parquet statistics.
+    """
+    parquet_path = ensure_store(csv_path)
+    if columns is not None:
+        columns = list(columns)
+    table = pq.read_table(
+        parquet_path,
+        columns=columns,
+        filters=year_filters(year_range),
+        memory_map=True,
+    )
+    return table.to_pandas()
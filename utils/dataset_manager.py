@@ -0,0 +1,166 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.preprocess import load_data, data_stamp
+
+DEFAULT_MEMORY_BUDGET = 512 * 1024 ** 2  # bytes held by derived frames
+BASE_CHAIN = ()
+# Sessions not seen for this long no longer pin their active frame; it is
+# rebuilt from its chain if the session comes back
+SESSION_IDLE_TIMEOUT = 30 * 60  # seconds
+
+
+def _private_nbytes(frame, base):
+    """Bytes held by `frame` that are not shared with the base frame."""
+    total = frame.index.memory_usage() if frame.index is not base.index else 0
+    for col in frame.columns:
+        values = frame[col].to_numpy()
+        if col in base.columns and np.shares_memory(values, base[col].to_numpy()):
+            continue
+        total += frame[col].memory_usage(index=False, deep=True)
+    return int(total)
+
+
+class DatasetManager:
+    """
+    Holds one immutable base frame per process and per-session derived frames.
+
+    Derived frames are keyed by (session_id, chain) where `chain` is the tuple
+    of transformation steps that produced them. Frames are handed out as
+    shallow views: callers may add, drop or replace columns without touching
+    the cached version, but must not write into existing columns in place.
+    Least recently used frames are evicted once the memory budget is
+    exceeded. A session's active frame is kept while the session is live;
+    sessions idle for `idle_timeout` seconds (e.g. closed browser tabs) lose
+    that pin, and their active frame is rebuilt from its chain on demand.
+    """
+
+    def __init__(self, base, memory_budget=DEFAULT_MEMORY_BUDGET, idle_timeout=SESSION_IDLE_TIMEOUT):
+        self._base = base
+        self.memory_budget = memory_budget
+        self.idle_timeout = idle_timeout
+        self._derived = OrderedDict()  # (session_id, chain) -> (frame, nbytes)
+        self._active = {}  # session_id -> chain
+        self._last_seen = {}  # session_id -> time.monotonic() of its last access
+        self._used = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base(self):
+        """Return a shallow view of the base frame."""
+        return self._base.copy(deep=False)
+
+    @property
+    def memory_used(self):
+        return self._used
+
+    def get(self, session_id, chain):
+        """Return a view of a cached derived frame, or None if missing."""
+        if chain == BASE_CHAIN:
+            return self.base
+        key = (session_id, chain)
+        with self._lock:
+            self._last_seen[session_id] = time.monotonic()
+            entry = self._derived.get(key)
+            if entry is None:
+                return None
+            self._derived.move_to_end(key)
+            return entry[0].copy(deep=False)
+
+    def put(self, session_id, chain, frame):
+        """Cache a derived frame under its transformation chain."""
+        key = (session_id, chain)
+        nbytes = _private_nbytes(frame, self._base)
+        with self._lock:
+            self._last_seen[session_id] = time.monotonic()
+            old = self._derived.pop(key, None)
+            if old is not None:
+                self._used -= old[1]
+            self._derived[key] = (frame, nbytes)
+            self._used += nbytes
+            self._evict()
+
+    def derive(self, session_id, chain, build, parent=None):
+        """
+        Return the frame for `chain`, building it from `parent` on a miss.
+
+        `build` receives a view of the parent frame (the base frame when
+        `parent` is None) and returns the derived frame.
+        """
+        frame = self.get(session_id, chain)
+        if frame is not None:
+            return frame
+        source = self.base if parent is None else parent.copy(deep=False)
+        frame = build(source)
+        self.put(session_id, chain, frame)
+        return frame.copy(deep=False)
+
+    def set_active(self, session_id, chain):
+        """Mark `chain` as the frame other pages of this session should use."""
+        with self._lock:
+            self._active[session_id] = chain
+            self._last_seen[session_id] = time.monotonic()
+
+    def active(self, session_id):
+        """Return the session's active frame (the base frame if none is set)."""
+        chain = self.active_chain(session_id)
+        frame = self.get(session_id, chain)
+        if frame is None:
+            # Evicted while the session was idle: replay its chain
+            frame = self.derive(session_id, chain, lambda base: replay_chain(base, chain))
+        return frame
+
+    def active_chain(self, session_id):
+        with self._lock:
+            return self._active.get(session_id, BASE_CHAIN)
+
+    def drop_session(self, session_id):
+        """Release every derived frame held for a session."""
+        with self._lock:
+            for key in [k for k in self._derived if k[0] == session_id]:
+                self._used -= self._derived.pop(key)[1]
+            self._active.pop(session_id, None)
+            self._last_seen.pop(session_id, None)
+
+    def _evict(self):
+        # Caller holds the lock. Only live sessions pin their active frame.
+        now = time.monotonic()
+        pinned = {(sid, chain) for sid, chain in self._active.items()
+                  if now - self._last_seen.get(sid, now) < self.idle_timeout}
+        for key in list(self._derived):
+            if self._used <= self.memory_budget:
+                break
+            if key in pinned:
+                continue
+            self._used -= self._derived.pop(key)[1]
+
+
+def replay_chain(base, chain):
+    """Rebuild a derived frame by applying its chain of (step name, *args) to `base`."""
+    from utils.feature_engineering import STEP_FUNCTIONS
+
+    frame = base
+    for name, *args in chain:
+        frame = STEP_FUNCTIONS[name](frame, *args)
+    return frame
+
+
+def get_dataset_manager():
+    """Return the process-wide dataset manager (a new one once the source CSV changes)."""
+    return _get_dataset_manager(data_stamp())
+
+
+@st.cache_resource(max_entries=1)
+def _get_dataset_manager(stamp):
+    return DatasetManager(load_data())
+
+
+def get_session_id():
+    """Return a stable identifier for the current Streamlit session."""
+    if "dataset_session_id" not in st.session_state:
+        st.session_state.dataset_session_id = uuid.uuid4().hex
+    return st.session_state.dataset_session_id
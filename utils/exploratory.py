@@ -1,15 +1,18 @@
 import pandas as pd
 import numpy as np
+from utils.stats_engine import get_stats
+from utils.timeseries_lod import get_pyramid, select_level, DEFAULT_WIDTH_PX
 
-def get_basic_stats(df):
+def get_basic_stats(df, fingerprint=None):
     """Return basic statistics and missing values info."""
-    summary = df.describe()
-    missing = df.isnull().sum()
-    return summary, missing
+    stats = get_stats(df, fingerprint=fingerprint)
+    if not stats.columns:
+        return df.describe(), df.isnull().sum()
+    return stats.describe(), stats.missing()
 
-def get_correlation(df):
-    """Return correlation matrix."""
-    return df.corr()
+def get_correlation(df, fingerprint=None):
+    """Return correlation matrix of the numeric columns."""
+    return get_stats(df, fingerprint=fingerprint).corr()
 
 def get_time_series(df, date_col, target_col):
     """Return data for simple time series lineplot without datetime parsing."""
@@ -24,8 +27,25 @@ def get_time_series(df, date_col, target_col):
 
     return ts_df
 
+def get_time_series_lod(df, date_col, target_col, date_range=None, width_px=DEFAULT_WIDTH_PX, fingerprint=None):
+    """
+    Return a plot-ready series of at most `width_px` points.
+
+    Points come from a cached multi-resolution pyramid (mean/min/max per
+    bucket), so the cost depends on the plot width, not the number of rows;
+    pass the frame's `dataset_fingerprint` to key that cache without hashing.
+    Columns: date_col, target_col (bucket mean), min, max, count.
+    """
+    pyramid = get_pyramid(df, date_col, target_col, fingerprint)
+    level_name, level = select_level(pyramid, date_range=date_range, width_px=width_px)
+    level = level.rename(columns={'bucket': date_col, 'mean': target_col})
+    return level_name, level
 
 
 def get_distribution_data(df, column):
     """Return data for distribution analysis."""
     return df[column].dropna()
+
+def get_histogram(df, column, fingerprint=None):
+    """Return precomputed histogram `(counts, edges)` for a numeric column."""
+    return get_stats(df, fingerprint=fingerprint).histogram(column)
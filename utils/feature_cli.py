@@ -0,0 +1,76 @@
+"""
+Run feature engineering steps over a CSV or Parquet file too large for memory.
+
+Steps are fitted by streaming the input, then applied chunk by chunk into a
+Parquet file, so memory use is bounded by the chunk size. Steps take the
+same (name, *arguments) form as the Feature Engineering page.
+
+    python -m utils.feature_cli data/processed_data.csv features.parquet \\
+        --step handle_missing_values median --step bin_numerical_variable year 5
+    python -m utils.feature_cli big.parquet out.parquet --step encode_categorical \\
+        --pipeline pipeline.json
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from utils.feature_engineering import (
+    DEFAULT_CHUNKSIZE,
+    STEP_FUNCTIONS,
+    FeaturePipeline,
+    csv_chunks,
+    parquet_chunks,
+    run_chunked,
+)
+
+
+def parse_value(token):
+    """Convert a step argument from the command line to int, float or str."""
+    for cast in (int, float):
+        try:
+            return cast(token)
+        except ValueError:
+            pass
+    return token
+
+
+def parse_step(tokens):
+    name, args = tokens[0], tokens[1:]
+    if name not in STEP_FUNCTIONS:
+        raise argparse.ArgumentTypeError(f"Unknown step '{name}'. Available steps: {list(STEP_FUNCTIONS)}")
+    return (name, *(parse_value(t) for t in args))
+
+
+def chunk_source(path, chunksize):
+    """Return a chunk source for a CSV or Parquet input file."""
+    if Path(path).suffix.lower() in (".parquet", ".pq"):
+        return parquet_chunks(path, chunksize)
+    return csv_chunks(path, chunksize)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Out-of-core feature engineering.")
+    parser.add_argument("input", help="Input CSV or Parquet file")
+    parser.add_argument("output", help="Output Parquet file")
+    parser.add_argument("--step", nargs="+", action="append", required=True, metavar="NAME [ARG ...]",
+                        help="A step and its arguments; repeat for each step, in order")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--pipeline", help="Also write the fitted pipeline to this JSON file")
+    args = parser.parse_args(argv)
+
+    try:
+        steps = [parse_step(tokens) for tokens in args.step]
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    states = run_chunked(chunk_source(args.input, args.chunksize), steps, args.output)
+    if args.pipeline:
+        with open(args.pipeline, "w") as f:
+            json.dump(FeaturePipeline(steps, states).to_dict(), f, indent=2)
+    print(f"Wrote {args.output} ({len(steps)} steps).", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
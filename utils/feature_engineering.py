@@ -1,20 +1,30 @@
+import threading
+from collections import OrderedDict
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import OneHotEncoder
-from sklearn.impute import SimpleImputer
+import pyarrow as pa
+import pyarrow.parquet as pq
+from utils.preprocess import dataset_fingerprint
+
+# Chunked (out-of-core) mode
+DEFAULT_CHUNKSIZE = 100_000
+RESERVOIR_SIZE = 20_000     # sample kept per column for medians
+MAX_TRACKED_VALUES = 10_000  # distinct values counted per column for the mode
+PIPELINE_CACHE_SIZE = 16
+
+# The stateful steps fit and apply their state with the same code a saved
+# FeaturePipeline replays, so both paths produce identical frames.
+def _fit_transform_step(df, step):
+    state = _fit_step(step, [df], reservoir_size=max(RESERVOIR_SIZE, len(df)))
+    return transform_chunk(df, [step], [state])
 
 def handle_missing_values(df, strategy='mean'):
-    """Impute missing values using the specified strategy."""
-    imputer = SimpleImputer(strategy=strategy)
-    numeric_cols = df.select_dtypes(include=np.number).columns
-    df[numeric_cols] = imputer.fit_transform(df[numeric_cols])
-    return df
+    """Impute missing numeric values using the specified strategy (mean, median or most_frequent)."""
+    return _fit_transform_step(df, ('handle_missing_values', strategy))
 
 def encode_categorical(df):
     """One-hot encode categorical variables."""
-    categorical_cols = df.select_dtypes(include='object').columns
-    df = pd.get_dummies(df, columns=categorical_cols, drop_first=True)
-    return df
+    return _fit_transform_step(df, ('encode_categorical',))
 
 # def extract_date_features(df, date_col):
 #     df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
@@ -27,20 +37,336 @@ def encode_categorical(df):
 #     df['quarter'] = df[date_col].dt.quarter
 #     return df
 
+def _with_column(df, column, values):
+    # A shallow copy plus setitem keeps the other columns shared with `df`
+    # (DataFrame.assign would deep-copy the whole frame)
+    df = df.copy(deep=False)
+    df[column] = values
+    return df
+
 def create_new_feature(df, col1, col2):
     """Create interaction term between two columns."""
-    df[f'{col1}_x_{col2}'] = df[col1] * df[col2]
-    return df
+    return _with_column(df, f'{col1}_x_{col2}', df[col1] * df[col2])
 
 def bin_numerical_variable(df, column, bins=5, labels=None):
     """Bin a numerical variable into discrete intervals."""
-    df[f'{column}_binned'] = pd.cut(df[column], bins=bins, labels=labels)
-    return df
+    return _fit_transform_step(df, ('bin_numerical_variable', column, bins, labels))
 
 def apply_transformation(df, column, transformation='log'):
     """Apply a mathematical transformation to a column."""
     if transformation == 'log':
-        df[f'{column}_log'] = np.log1p(df[column])
+        return _with_column(df, f'{column}_log', np.log1p(df[column]))
     elif transformation == 'sqrt':
-        df[f'{column}_sqrt'] = np.sqrt(df[column])
+        return _with_column(df, f'{column}_sqrt', np.sqrt(df[column]))
     return df
+
+
+# ---------------------------------------------------------------------------
+# Chunked mode
+#
+# Steps use the same form as the Feature Engineering page's transformation
+# chain: (function name, *arguments), e.g. ('handle_missing_values', 'median')
+# or ('bin_numerical_variable', 'year', 5). Fitting streams the source once
+# per stateful step (imputation, encoding, binning), each time through the
+# steps already fitted before it, so every statistic is computed on the same
+# data the in-memory functions would see. A final pass applies all steps
+# chunk by chunk and appends the result to a Parquet file
+# (`python -m utils.feature_cli`).
+# ---------------------------------------------------------------------------
+
+STATEFUL_STEPS = ('handle_missing_values', 'encode_categorical', 'bin_numerical_variable')
+
+
+class ColumnSketch:
+    """
+    Streaming summary of one numeric column: count, sum and range, plus a
+    reservoir sample (for medians) and value counts (for the mode) only when
+    asked for, since those are the parts that cost memory.
+    """
+
+    def __init__(self, reservoir_size=0, track_counts=False, seed=0):
+        self.count = 0
+        self.total = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.seen = 0
+        self.reservoir = np.empty(0)
+        self.reservoir_size = reservoir_size
+        self.track_counts = track_counts
+        self.value_counts = pd.Series(dtype='int64')
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        values = pd.to_numeric(values, errors='coerce').to_numpy(dtype=float)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.count += len(values)
+        self.total += values.sum()
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+
+        if self.reservoir_size:
+            # Reservoir sampling (algorithm R), vectorized over the chunk
+            room = self.reservoir_size - len(self.reservoir)
+            if room > 0:
+                self.reservoir = np.concatenate([self.reservoir, values[:room]])
+            rest = values[max(room, 0):]
+            if len(rest):
+                positions = self.seen + max(room, 0) + np.arange(len(rest))
+                slots = (self._rng.random(len(rest)) * (positions + 1)).astype(np.int64)
+                keep = slots < self.reservoir_size
+                self.reservoir[slots[keep]] = rest[keep]
+        self.seen += len(values)
+
+        if self.track_counts:
+            counts = self.value_counts.add(pd.Series(values).value_counts(), fill_value=0)
+            if len(counts) > MAX_TRACKED_VALUES:
+                counts = counts.nlargest(MAX_TRACKED_VALUES)
+            self.value_counts = counts
+
+    def fill_value(self, strategy):
+        """Return the imputation value for a SimpleImputer strategy."""
+        if not self.count:
+            return np.nan
+        if strategy == 'mean':
+            return self.total / self.count
+        if strategy == 'median':
+            if not self.reservoir_size:
+                raise ValueError("Medians need a sketch with a reservoir.")
+            # Exact while the column fits in the reservoir, a sample estimate beyond
+            return float(np.median(self.reservoir))
+        if strategy == 'most_frequent':
+            if not self.track_counts:
+                raise ValueError("The mode needs a sketch that tracks value counts.")
+            counts = self.value_counts
+            return float(counts[counts == counts.max()].index.min())
+        raise ValueError(f"Unsupported imputation strategy: {strategy}")
+
+    def bin_edges(self, bins):
+        """Return the edges `pd.cut(values, bins=bins)` would use for this column."""
+        lo, hi = self.min, self.max
+        if lo == hi:
+            adj = 0.001 * abs(lo) if lo != 0 else 0.001
+            return np.linspace(lo - adj, hi + adj, bins + 1)
+        edges = np.linspace(lo, hi, bins + 1)
+        edges[0] -= (hi - lo) * 0.001
+        return edges
+
+
+def _fit_step(step, chunks, reservoir_size=RESERVOIR_SIZE):
+    """Stream `chunks` once and return the fitted state of a stateful step."""
+    name, args = step[0], step[1:]
+    if name == 'handle_missing_values':
+        strategy = args[0] if args else 'mean'
+        # Keep only what the strategy needs: a sample for medians, counts for the mode
+        sample_size = reservoir_size if strategy == 'median' else 0
+        track_counts = strategy == 'most_frequent'
+        sketches = {}
+        for chunk in chunks:
+            for column in chunk.select_dtypes(include=np.number).columns:
+                if column not in sketches:
+                    sketches[column] = ColumnSketch(sample_size, track_counts)
+                sketches[column].update(chunk[column])
+        return {column: sketch.fill_value(strategy) for column, sketch in sketches.items()}
+    if name == 'encode_categorical':
+        vocabularies = {}
+        for chunk in chunks:
+            for column in chunk.select_dtypes(include='object').columns:
+                vocabularies.setdefault(column, set()).update(chunk[column].dropna().unique())
+        return {column: sorted(values) for column, values in vocabularies.items()}
+    if name == 'bin_numerical_variable':
+        column, bins = args[0], (args[1] if len(args) > 1 else 5)
+        sketch = ColumnSketch()
+        for chunk in chunks:
+            sketch.update(chunk[column])
+        return sketch.bin_edges(bins)
+    return None
+
+
+def transform_chunk(chunk, steps, states):
+    """Apply fitted steps to one chunk; `states` is aligned with `steps`."""
+    for step, state in zip(steps, states):
+        name, args = step[0], step[1:]
+        if name == 'handle_missing_values':
+            fills = {c: v for c, v in state.items() if c in chunk.columns and not np.isnan(v)}
+            # Replace only the imputed columns so the rest stay shared with the input
+            chunk = chunk.copy(deep=False)
+            for column, value in fills.items():
+                values = chunk[column]
+                if values.dtype != float:
+                    values = values.astype(float)
+                if values.hasnans:
+                    values = values.fillna(value)
+                chunk[column] = values
+        elif name == 'encode_categorical':
+            encoded = [chunk.drop(columns=list(state))]
+            for column, categories in state.items():
+                values = pd.Categorical(chunk[column], categories=categories)
+                encoded.append(pd.get_dummies(values, prefix=column, drop_first=True).set_index(chunk.index))
+            chunk = pd.concat(encoded, axis=1, copy=False)
+        elif name == 'bin_numerical_variable':
+            labels = args[2] if len(args) > 2 else None
+            chunk = _with_column(chunk, f'{args[0]}_binned', pd.cut(chunk[args[0]], bins=state, labels=labels))
+        else:
+            chunk = STEP_FUNCTIONS[name](chunk, *args)
+    return chunk
+
+
+def fit_chunked(chunk_source, steps, reservoir_size=RESERVOIR_SIZE):
+    """
+    Fit every stateful step by streaming `chunk_source()`.
+
+    `chunk_source` is a callable returning a fresh iterator of DataFrames;
+    it is called once per stateful step. Returns the list of fitted states.
+    """
+    states = []
+    for i, step in enumerate(steps):
+        if step[0] in STATEFUL_STEPS:
+            fitted_steps, fitted_states = steps[:i], list(states)
+            chunks = (transform_chunk(chunk, fitted_steps, fitted_states) for chunk in chunk_source())
+            states.append(_fit_step(step, chunks, reservoir_size))
+        else:
+            states.append(None)
+    return states
+
+
+def _to_columnar(chunk):
+    # Interval bins have no stable Arrow type; store their labels instead
+    for column in chunk.columns:
+        if isinstance(chunk[column].dtype, pd.CategoricalDtype):
+            chunk = chunk.assign(**{column: chunk[column].astype(str).where(chunk[column].notna())})
+    numeric = chunk.select_dtypes(include=np.number).columns
+    # Integer columns may gain NaNs in later chunks: write all numbers as float64
+    return chunk.astype({c: 'float64' for c in numeric})
+
+
+def run_chunked(chunk_source, steps, output_path):
+    """
+    Fit `steps` over the chunk stream, then transform chunk by chunk into a
+    Parquet file at `output_path`. Memory is bounded by the chunk size.
+    Returns the fitted states.
+    """
+    states = fit_chunked(chunk_source, steps)
+    writer = None
+    try:
+        for chunk in chunk_source():
+            table = pa.Table.from_pandas(_to_columnar(transform_chunk(chunk, steps, states)), preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, table.schema)
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+    return states
+
+
+def csv_chunks(path, chunksize=DEFAULT_CHUNKSIZE, **read_csv_kwargs):
+    """Return a chunk source reading a CSV file in `chunksize`-row pieces."""
+    return lambda: pd.read_csv(path, chunksize=chunksize, **read_csv_kwargs)
+
+
+def parquet_chunks(path, chunksize=DEFAULT_CHUNKSIZE, columns=None):
+    """Return a chunk source reading a Parquet file in `chunksize`-row batches."""
+    def source():
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    return source
+
+
+STEP_FUNCTIONS = {
+    'handle_missing_values': handle_missing_values,
+    'encode_categorical': encode_categorical,
+    'create_new_feature': create_new_feature,
+    'bin_numerical_variable': bin_numerical_variable,
+    'apply_transformation': apply_transformation,
+}
+
+
+# ---------------------------------------------------------------------------
+# Fitted pipeline
+# ---------------------------------------------------------------------------
+
+class FeaturePipeline:
+    """
+    An ordered list of feature engineering steps plus their fitted state
+    (imputation values, dummy vocabularies, bin edges).
+
+    Once fitted, `transform()` replays every step on new data in one pass
+    without refitting, so a model's inputs can be rebuilt at evaluation and
+    prediction time. `to_dict()`/`from_dict()` round-trip through JSON, which
+    is how pipelines are stored in model manifests.
+    """
+
+    def __init__(self, steps=(), states=None):
+        self.steps = tuple(tuple(step) for step in steps)
+        self.states = states
+
+    @property
+    def fitted(self):
+        return self.states is not None
+
+    def fit(self, df):
+        # In memory the reservoir holds every value, so medians are exact,
+        # matching the step functions
+        source = lambda: iter([df])
+        self.states = fit_chunked(source, self.steps, reservoir_size=max(RESERVOIR_SIZE, len(df)))
+        return self
+
+    def transform(self, df):
+        if not self.fitted:
+            raise ValueError("FeaturePipeline must be fitted before transform.")
+        return transform_chunk(df, self.steps, self.states)
+
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
+
+    def to_dict(self):
+        states = None
+        if self.fitted:
+            states = []
+            for step, state in zip(self.steps, self.states):
+                if step[0] == 'handle_missing_values':
+                    state = {c: None if np.isnan(v) else float(v) for c, v in state.items()}
+                elif step[0] == 'bin_numerical_variable':
+                    state = [float(edge) for edge in state]
+                states.append(state)
+        return {'steps': [list(step) for step in self.steps], 'states': states}
+
+    @classmethod
+    def from_dict(cls, data):
+        steps = [tuple(step) for step in data.get('steps', [])]
+        states = data.get('states')
+        if states is not None:
+            states = list(states)
+            for i, step in enumerate(steps):
+                if step[0] == 'handle_missing_values':
+                    states[i] = {c: np.nan if v is None else v for c, v in states[i].items()}
+                elif step[0] == 'bin_numerical_variable':
+                    states[i] = np.asarray(states[i], dtype=float)
+        return cls(steps, states)
+
+
+_pipeline_cache = OrderedDict()
+_pipeline_lock = threading.Lock()
+
+
+def get_fitted_pipeline(df, steps):
+    """
+    Return a FeaturePipeline for `steps` fitted on `df`.
+
+    Fitted pipelines are cached on (dataset fingerprint, steps), so reruns
+    with the same data and steps never refit.
+    """
+    steps = tuple(tuple(step) for step in steps)
+    key = (dataset_fingerprint(df), steps)
+    with _pipeline_lock:
+        if key in _pipeline_cache:
+            _pipeline_cache.move_to_end(key)
+            return _pipeline_cache[key]
+    pipeline = FeaturePipeline(steps).fit(df)
+    with _pipeline_lock:
+        _pipeline_cache[key] = pipeline
+        while len(_pipeline_cache) > PIPELINE_CACHE_SIZE:
+            _pipeline_cache.popitem(last=False)
+    return pipeline
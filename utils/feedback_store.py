@@ -0,0 +1,642 @@
+import os
+import json
+import hashlib
+import time
+import random
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+GOOGLE_SHEET_NAME = "Feedback_Capstone"
+GOOGLE_SHEET_WORKSHEET_NAME = "Sheet1"
+LOCAL_GOOGLE_CREDENTIALS_PATH = "google_credentials.json"
+GOOGLE_SCOPES = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
+FEEDBACK_HEADER = ["Timestamp", "Name", "Email", "Rating", "Feedback"]
+
+# Submissions are written to a local SQLite outbox first and pushed to the
+# backend by a background flusher, so submitting never waits on the network.
+FEEDBACK_DB_PATH = Path(__file__).resolve().parent.parent / "data" / "feedback.sqlite"
+# "sheets" or "local"; by default sheets is used when credentials are found
+BACKEND_ENV_VAR = "FEEDBACK_BACKEND"
+FLUSH_INTERVAL = 2.0     # seconds between flusher passes when idle
+FLUSH_BATCH_SIZE = 200   # rows per backend append
+SENTIMENT_COLUMN = "Sentiment"
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 300.0
+SHEETS_SYNC_INTERVAL = 30.0  # seconds between replica syncs against the sheet
+SHEETS_POOL_SIZE = 4         # pooled HTTPS connections of the shared client
+
+_client = None
+_client_lock = threading.Lock()
+_initialized_dbs = set()
+_init_lock = threading.Lock()
+
+
+def _service_account_info():
+    """Return the service-account credentials from st.secrets, or None."""
+    try:
+        return st.secrets.get("gcp_service_account") or None
+    except Exception:
+        # No secrets.toml (local development)
+        return None
+
+
+def has_sheets_credentials():
+    return _service_account_info() is not None or os.path.exists(LOCAL_GOOGLE_CREDENTIALS_PATH)
+
+
+def get_gspread_client():
+    """
+    Return the process-wide gspread client, authenticating on first use.
+
+    Credentials come from st.secrets["gcp_service_account"] or the local
+    google_credentials.json. Raises RuntimeError if neither is available.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            import gspread  # deferred: only needed with the sheets backend
+
+            creds = _service_account_info()
+            if creds is not None:
+                _client = gspread.service_account_from_dict(dict(creds), scopes=GOOGLE_SCOPES)
+            elif os.path.exists(LOCAL_GOOGLE_CREDENTIALS_PATH):
+                _client = gspread.service_account(filename=LOCAL_GOOGLE_CREDENTIALS_PATH, scopes=GOOGLE_SCOPES)
+            else:
+                raise RuntimeError(
+                    "Google Sheets credentials not found. Configure them in .streamlit/secrets.toml "
+                    "or put 'google_credentials.json' in the project root."
+                )
+            # Keep-alive connection pool shared by every page and the flusher
+            from requests.adapters import HTTPAdapter
+
+            adapter = HTTPAdapter(pool_connections=SHEETS_POOL_SIZE, pool_maxsize=SHEETS_POOL_SIZE)
+            _client.session.mount("https://", adapter)
+        return _client
+
+
+class SheetsBackend:
+    """Google Sheets worksheet holding the feedback rows under FEEDBACK_HEADER."""
+
+    name = "sheets"
+    sync_interval = SHEETS_SYNC_INTERVAL
+
+    def __init__(self, sheet_name=GOOGLE_SHEET_NAME, worksheet_name=GOOGLE_SHEET_WORKSHEET_NAME):
+        self.sheet_name = sheet_name
+        self.worksheet_name = worksheet_name
+        self.key = f"sheets:{sheet_name}/{worksheet_name}"
+        self._worksheet = None
+
+    @property
+    def worksheet(self):
+        # Opened (and the header checked) once, not on every append
+        if self._worksheet is None:
+            worksheet = get_gspread_client().open(self.sheet_name).worksheet(self.worksheet_name)
+            if worksheet.row_values(1) != FEEDBACK_HEADER:
+                worksheet.insert_row(FEEDBACK_HEADER, 1)
+            self._worksheet = worksheet
+        return self._worksheet
+
+    def append_rows(self, rows):
+        try:
+            self.worksheet.append_rows(rows, value_input_option="RAW")
+        except Exception:
+            self._worksheet = None  # reopen on the next attempt
+            raise
+
+    def read_rows_since(self, n):
+        """Return the data rows after the first `n` (row 1 is the header)."""
+        last_col = chr(ord("A") + len(FEEDBACK_HEADER) - 1)
+        return list(self.worksheet.get(f"A{n + 2}:{last_col}"))
+
+
+class LocalBackend:
+    """Feedback rows kept in a table of the local SQLite database (no network)."""
+
+    name = "local"
+    key = "local"
+    sync_interval = FLUSH_INTERVAL
+
+    def __init__(self, db_path=FEEDBACK_DB_PATH):
+        self.db_path = Path(db_path)
+
+    def append_rows(self, rows):
+        with _db(self.db_path) as conn:
+            conn.executemany("INSERT INTO local_feedback (row_json) VALUES (?)",
+                             [(json.dumps(row),) for row in rows])
+
+    def read_rows_since(self, n):
+        with _db(self.db_path) as conn:
+            rows = conn.execute("SELECT row_json FROM local_feedback ORDER BY id LIMIT -1 OFFSET ?", (n,))
+            return [json.loads(r) for (r,) in rows]
+
+
+def _connect(db_path):
+    # The first connection to a database creates its directory and schema;
+    # the lock keeps threads from racing through that (including migrations)
+    with _init_lock:
+        if db_path not in _initialized_dbs:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(db_path, timeout=30)
+            try:
+                _init_db(conn)
+            finally:
+                conn.close()
+            _initialized_dbs.add(db_path)
+    return sqlite3.connect(db_path, timeout=30)
+
+
+def _init_db(conn):
+    """Create the tables and indexes, migrating older replicas."""
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            row_json TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT
+        );
+        CREATE TABLE IF NOT EXISTS local_feedback (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            row_json TEXT NOT NULL
+        );
+        -- Replica of the backend rows; row_number is the 1-based data row
+        CREATE TABLE IF NOT EXISTS feedback (
+            row_number INTEGER PRIMARY KEY,
+            timestamp TEXT,
+            name TEXT,
+            email TEXT,
+            rating REAL,
+            feedback TEXT
+        );
+        CREATE INDEX IF NOT EXISTS feedback_rating ON feedback (rating);
+        CREATE INDEX IF NOT EXISTS feedback_timestamp ON feedback (timestamp);
+        CREATE TABLE IF NOT EXISTS sync_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            backend TEXT NOT NULL,
+            synced_rows INTEGER NOT NULL
+        );
+        -- Aggregates maintained incrementally as rows are synced
+        CREATE TABLE IF NOT EXISTS agg_rating (
+            rating REAL PRIMARY KEY,
+            n INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS agg_daily (
+            day TEXT PRIMARY KEY,
+            n INTEGER NOT NULL,
+            rating_n INTEGER NOT NULL,
+            rating_sum REAL NOT NULL
+        );
+        -- Sentiment of each distinct feedback text, scored once per content hash
+        CREATE TABLE IF NOT EXISTS sentiment_cache (
+            content_hash TEXT PRIMARY KEY,
+            label INTEGER NOT NULL,
+            score REAL,
+            model_version INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS agg_sentiment (
+            label INTEGER PRIMARY KEY,
+            n INTEGER NOT NULL,
+            rating_n INTEGER NOT NULL,
+            rating_sum REAL NOT NULL
+        );
+    """)
+    columns = [c[1] for c in conn.execute("PRAGMA table_info(feedback)")]
+    if 'content_hash' not in columns:
+        # Replicas created before sentiment scoring: add and backfill the hash
+        with conn:
+            conn.execute("ALTER TABLE feedback ADD COLUMN content_hash TEXT")
+            rows = conn.execute("SELECT row_number, feedback FROM feedback").fetchall()
+            conn.executemany("UPDATE feedback SET content_hash = ? WHERE row_number = ?",
+                             [(content_hash(text), n) for n, text in rows])
+    conn.execute("CREATE INDEX IF NOT EXISTS feedback_content_hash ON feedback (content_hash)")
+
+
+@contextmanager
+def _db(db_path):
+    """Open a connection, commit on success and always close it."""
+    conn = _connect(Path(db_path))
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def content_hash(text):
+    """Return the cache key of a feedback text."""
+    return hashlib.sha1(str(text or "").encode("utf-8")).hexdigest()
+
+
+def _apply_sentiment_aggregates(conn, hash_filter, params=()):
+    """Add the replica rows selected by `hash_filter` (a condition on f.content_hash) to agg_sentiment."""
+    conn.execute(f"""
+        INSERT INTO agg_sentiment
+        SELECT s.label, COUNT(*), COUNT(f.rating), COALESCE(SUM(f.rating), 0)
+        FROM feedback f JOIN sentiment_cache s ON s.content_hash = f.content_hash
+        WHERE {hash_filter}
+        GROUP BY s.label
+        ON CONFLICT(label) DO UPDATE SET n = n + excluded.n,
+            rating_n = rating_n + excluded.rating_n, rating_sum = rating_sum + excluded.rating_sum
+    """, params)
+
+
+def _apply_aggregates(conn, records):
+    """
+    Fold replica records (row_number, timestamp, name, email, rating, feedback)
+    into the rating histogram and the per-day counts and rating sums.
+    """
+    if not records:
+        return
+    frame = pd.DataFrame(records, columns=['row_number', *FEEDBACK_HEADER])
+    ratings = frame['Rating'].dropna().value_counts()
+    conn.executemany(
+        "INSERT INTO agg_rating VALUES (?, ?) ON CONFLICT(rating) DO UPDATE SET n = n + excluded.n",
+        [(float(r), int(n)) for r, n in ratings.items()],
+    )
+    days = pd.to_datetime(frame['Timestamp'], errors='coerce').dt.strftime('%Y-%m-%d')
+    daily = frame.assign(day=days).dropna(subset=['day']).groupby('day').agg(
+        n=('row_number', 'size'), rating_n=('Rating', 'count'), rating_sum=('Rating', 'sum')
+    )
+    conn.executemany(
+        "INSERT INTO agg_daily VALUES (?, ?, ?, ?) ON CONFLICT(day) DO UPDATE SET "
+        "n = n + excluded.n, rating_n = rating_n + excluded.rating_n, rating_sum = rating_sum + excluded.rating_sum",
+        [(day, int(r.n), int(r.rating_n), float(r.rating_sum)) for day, r in daily.iterrows()],
+    )
+
+
+def _rebuild_aggregates(conn):
+    """Recompute every aggregate from the replica (after a resync or an upgrade)."""
+    conn.execute("DELETE FROM agg_rating")
+    conn.execute("DELETE FROM agg_daily")
+    conn.execute("DELETE FROM agg_sentiment")
+    _apply_aggregates(conn, conn.execute(
+        "SELECT row_number, timestamp, name, email, rating, feedback FROM feedback"
+    ).fetchall())
+    _apply_sentiment_aggregates(conn, "1")
+
+
+def _to_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class FeedbackStore:
+    """
+    Write-ahead feedback store with a local replica.
+
+    `submit()` appends the row to the SQLite outbox and returns; a daemon
+    thread flushes the outbox to the backend in batches, backing off
+    exponentially (with jitter) while the backend fails. Rows leave the
+    outbox only after the backend accepted them, so nothing is lost when
+    the app restarts; a crash between the append and the delete can at
+    worst send a batch twice.
+
+    The same thread keeps the `feedback` table in sync with the backend by
+    fetching only the rows past the last synced row count. Readers query
+    that table (indexed on rating and timestamp) plus the outbox, and never
+    touch the network. Each sync also folds the new rows into persisted
+    aggregates (rating histogram, per-day counts and rating sums), so the
+    dashboard's summaries cost the same however much feedback there is.
+    """
+
+    def __init__(self, backend, db_path=FEEDBACK_DB_PATH, flush_interval=FLUSH_INTERVAL):
+        self.backend = backend
+        self.db_path = Path(db_path)
+        self.flush_interval = flush_interval
+        self.failures = 0
+        self.last_error = None
+        self.last_sync = 0.0
+        self.sentiment_error = None
+        self.sync_requested = False
+        self._sync_requests = 0  # request_sync() calls so far
+        self._syncs_done = 0     # requests covered by a finished sync pass
+        self._scored_version = None  # sentiment model version last scored with
+        self._wake = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        _connect(self.db_path).close()
+
+    def submit(self, row):
+        """Queue one feedback row (in FEEDBACK_HEADER order); returns its outbox id."""
+        with _db(self.db_path) as conn:
+            row_id = conn.execute("INSERT INTO outbox (row_json) VALUES (?)", (json.dumps(row),)).lastrowid
+        self._wake.set()
+        return row_id
+
+    def pending_rows(self):
+        """Return the rows still waiting in the outbox, oldest first."""
+        with _db(self.db_path) as conn:
+            return [json.loads(r) for (r,) in conn.execute("SELECT row_json FROM outbox ORDER BY id")]
+
+    def pending_count(self):
+        with _db(self.db_path) as conn:
+            return conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def flush(self, batch_size=FLUSH_BATCH_SIZE):
+        """
+        Push queued rows to the backend in batches. Returns the number of rows
+        flushed; raises the backend's error after recording it on the batch.
+        """
+        flushed = 0
+        with self._flush_lock:
+            while True:
+                with _db(self.db_path) as conn:
+                    batch = conn.execute("SELECT id, row_json FROM outbox ORDER BY id LIMIT ?",
+                                         (batch_size,)).fetchall()
+                if not batch:
+                    return flushed
+                ids = [(row_id,) for row_id, _ in batch]
+                try:
+                    self.backend.append_rows([json.loads(r) for _, r in batch])
+                except Exception as e:
+                    with _db(self.db_path) as conn:
+                        conn.executemany(
+                            "UPDATE outbox SET attempts = attempts + 1, last_error = ? WHERE id = ?",
+                            [(str(e), row_id) for (row_id,) in ids],
+                        )
+                    raise
+                with _db(self.db_path) as conn:
+                    conn.executemany("DELETE FROM outbox WHERE id = ?", ids)
+                flushed += len(batch)
+
+    def sync(self):
+        """
+        Copy backend rows past the last synced row into the replica.
+        Returns the number of new rows. Rows are assumed append-only; call
+        `resync()` after rows were deleted or reordered in the backend.
+        """
+        with self._flush_lock:
+            with _db(self.db_path) as conn:
+                state = conn.execute("SELECT backend, synced_rows FROM sync_state").fetchone()
+            synced = state[1] if state and state[0] == self.backend.key else 0
+            rows = self.backend.read_rows_since(synced)
+            width = len(FEEDBACK_HEADER)
+            records = []
+            for i, row in enumerate(rows, start=synced + 1):
+                row = (list(row) + [""] * width)[:width]  # the API trims trailing empty cells
+                records.append((i, row[0], row[1], row[2], _to_number(row[3]), row[4]))
+            with _db(self.db_path) as conn:
+                if synced == 0:
+                    conn.execute("DELETE FROM feedback")
+                conn.executemany(
+                    "INSERT OR REPLACE INTO feedback "
+                    "(row_number, timestamp, name, email, rating, feedback, content_hash) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(*record, content_hash(record[5])) for record in records],
+                )
+                conn.execute("INSERT OR REPLACE INTO sync_state VALUES (1, ?, ?)",
+                             (self.backend.key, synced + len(records)))
+                # Same transaction: the aggregates always match the replica
+                aggregated = conn.execute("SELECT EXISTS (SELECT 1 FROM agg_rating)").fetchone()[0]
+                if synced == 0 or not aggregated:
+                    _rebuild_aggregates(conn)
+                else:
+                    _apply_aggregates(conn, records)
+                    # New rows whose text was already scored count right away
+                    if records:
+                        _apply_sentiment_aggregates(conn, "f.row_number > ?", (synced,))
+            self.last_sync = time.time()
+            return len(records)
+
+    def score_sentiment(self, batch_size=None):
+        """
+        Score replica texts with no cached sentiment from the current model.
+
+        Each distinct text (by content hash) is scored once per sentiment
+        model version, in batches through `predict_batch`; rows sharing a
+        text reuse its score. Texts scored by an older model version are
+        rescored. Returns the number of texts scored. Raises
+        FileNotFoundError while no sentiment model has been trained.
+        """
+        from utils.climate_text_analysis import DEFAULT_BATCH_SIZE, get_sentiment_predictor, predict_batch
+
+        predictor = get_sentiment_predictor()
+        predictor.model  # load (or fail) before scoring
+        version = predictor.version
+        with _db(self.db_path) as conn:
+            todo = conn.execute("""
+                SELECT f.content_hash, MIN(f.feedback) FROM feedback f
+                LEFT JOIN sentiment_cache s ON s.content_hash = f.content_hash
+                WHERE s.content_hash IS NULL OR s.model_version IS NOT ?
+                GROUP BY f.content_hash
+            """, (version,)).fetchall()
+        if not todo:
+            return 0
+        scored = predict_batch([text or "" for _, text in todo], batch_size=batch_size or DEFAULT_BATCH_SIZE)
+        scores = scored['proba_1'] if 'proba_1' in scored else pd.Series(np.nan, index=scored.index)
+        entries = [(h, int(label), None if pd.isna(score) else float(score), version)
+                   for (h, _), label, score in zip(todo, scored['label'], scores)]
+
+        # Serialized with sync() and other scorers, so no row is counted twice
+        with self._flush_lock, _db(self.db_path) as conn:
+            conn.execute("CREATE TEMP TABLE scored (content_hash TEXT PRIMARY KEY, label INTEGER, "
+                         "score REAL, model_version INTEGER)")
+            conn.executemany("INSERT INTO scored VALUES (?, ?, ?, ?)", entries)
+            # Drop texts another scorer already stored for this model version
+            conn.execute("""
+                DELETE FROM scored WHERE content_hash IN
+                    (SELECT content_hash FROM sentiment_cache WHERE model_version IS ?)
+            """, (version,))
+            rescored = conn.execute("SELECT COUNT(*) FROM scored JOIN sentiment_cache USING (content_hash)").fetchone()[0]
+            conn.execute("INSERT OR REPLACE INTO sentiment_cache SELECT * FROM scored")
+            if rescored:
+                # Labels from an older model changed: recount every sentiment
+                conn.execute("DELETE FROM agg_sentiment")
+                _apply_sentiment_aggregates(conn, "1")
+            else:
+                _apply_sentiment_aggregates(conn, "f.content_hash IN (SELECT content_hash FROM scored)")
+            return conn.execute("SELECT COUNT(*) FROM scored").fetchone()[0]
+
+    def _score_in_background(self, synced_rows):
+        # Score new rows; rescore after a retrain or a failed attempt. Scoring
+        # errors (e.g. no model trained yet) must not stall syncing
+        from utils.climate_text_analysis import get_sentiment_predictor
+
+        try:
+            predictor = get_sentiment_predictor()
+            predictor.model  # picks up a newly trained model from disk
+            if synced_rows or self.sentiment_error or predictor.version != self._scored_version:
+                self.score_sentiment()
+                self._scored_version = predictor.version
+            self.sentiment_error = None
+        except Exception as e:
+            self.sentiment_error = str(e)
+
+    def resync(self):
+        """Drop the replica and copy every backend row again."""
+        with _db(self.db_path) as conn:
+            conn.execute("DELETE FROM sync_state")
+        return self.sync()
+
+    def start(self):
+        """Start the background flusher (idempotent)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="feedback-flusher", daemon=True)
+            self._thread.start()
+        return self
+
+    def request_sync(self):
+        """Ask the background thread to sync now; returns immediately."""
+        self._sync_requests += 1
+        self.sync_requested = True
+        self.start()
+        self._wake.set()
+
+    @property
+    def syncing(self):
+        """True until a sync pass has finished (or failed) after the last request_sync()."""
+        return self._syncs_done < self._sync_requests
+
+    def _run(self):
+        while True:
+            self._wake.clear()
+            # Clear the flag before syncing so a request made meanwhile gets its own pass
+            requested, self.sync_requested = self.sync_requested, False
+            covered = self._sync_requests
+            try:
+                flushed = self.flush()
+                if requested or flushed or time.time() - self.last_sync >= self.backend.sync_interval:
+                    self._score_in_background(self.sync())
+                self.failures, self.last_error = 0, None
+                delay = self.flush_interval
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (self.failures - 1))
+                delay *= random.uniform(0.5, 1.0)
+            if requested:
+                self._syncs_done = covered  # done, or failed with last_error set
+            self._wake.wait(delay)
+
+    def _pending_frame(self):
+        df = pd.DataFrame(self.pending_rows(), columns=FEEDBACK_HEADER)
+        df['Rating'] = pd.to_numeric(df['Rating'], errors='coerce')
+        return df
+
+    def query(self, rating_gt=None, rating_le=None, sentiment=None):
+        """
+        Return feedback rows (replica, then still-queued rows) as a DataFrame,
+        optionally filtered to `Rating > rating_gt` and/or `Rating <= rating_le`
+        and to a sentiment label. The filters run in SQLite on the rating and
+        content-hash indexes; rows not scored yet have no Sentiment.
+        """
+        clauses, params = [], []
+        if rating_gt is not None:
+            clauses.append("f.rating > ?")
+            params.append(rating_gt)
+        if rating_le is not None:
+            clauses.append("f.rating <= ?")
+            params.append(rating_le)
+        if sentiment is not None:
+            clauses.append("s.label = ?")
+            params.append(int(sentiment))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with _db(self.db_path) as conn:
+            rows = conn.execute(f"""
+                SELECT f.timestamp, f.name, f.email, f.rating, f.feedback, s.label
+                FROM feedback f LEFT JOIN sentiment_cache s ON s.content_hash = f.content_hash
+                {where} ORDER BY f.row_number
+            """, params).fetchall()
+        df = pd.DataFrame(rows, columns=[*FEEDBACK_HEADER, SENTIMENT_COLUMN])
+        pending = self._pending_frame()
+        if rating_gt is not None:
+            pending = pending[pending['Rating'] > rating_gt]
+        if rating_le is not None:
+            pending = pending[pending['Rating'] <= rating_le]
+        if not pending.empty and sentiment is None:
+            # Queued rows are not scored yet; skip an empty replica so concat
+            # doesn't warn about (or infer dtypes from) an empty frame
+            pending = pending.reindex(columns=df.columns)
+            df = pd.concat([df, pending], ignore_index=True) if not df.empty else pending
+        df['Rating'] = pd.to_numeric(df['Rating'], errors='coerce')
+        df[SENTIMENT_COLUMN] = df[SENTIMENT_COLUMN].astype('Int64')
+        return df
+
+    def rating_counts(self):
+        """Return the number of feedback rows per rating, sorted by rating."""
+        with _db(self.db_path) as conn:
+            rows = conn.execute("SELECT rating, n FROM agg_rating ORDER BY rating").fetchall()
+        counts = pd.Series(dict(rows), dtype='int64')
+        pending = self._pending_frame()['Rating'].dropna().value_counts()
+        counts = counts.add(pending, fill_value=0).astype('int64').sort_index()
+        return counts.rename(index=lambda r: int(r) if float(r).is_integer() else r)
+
+    def sentiment_stats(self):
+        """Return `count` and `avg_rating` per sentiment label (scored rows only)."""
+        with _db(self.db_path) as conn:
+            rows = conn.execute("SELECT label, n, rating_n, rating_sum FROM agg_sentiment ORDER BY label").fetchall()
+        stats = pd.DataFrame(rows, columns=['label', 'count', 'rating_n', 'rating_sum']).set_index('label')
+        with np.errstate(invalid='ignore', divide='ignore'):
+            stats['avg_rating'] = stats.pop('rating_sum') / stats.pop('rating_n')
+        return stats
+
+    def daily_stats(self):
+        """
+        Return per-day `count`, `rating_n` and `rating_sum` over a continuous
+        daily index (days without feedback are zero), including queued rows.
+        """
+        with _db(self.db_path) as conn:
+            rows = conn.execute("SELECT day, n, rating_n, rating_sum FROM agg_daily ORDER BY day").fetchall()
+        daily = pd.DataFrame(rows, columns=['day', 'count', 'rating_n', 'rating_sum'])
+        pending = self._pending_frame()
+        if not pending.empty:
+            pending_daily = pending.assign(
+                day=pd.to_datetime(pending['Timestamp'], errors='coerce').dt.strftime('%Y-%m-%d')
+            ).dropna(subset=['day']).groupby('day').agg(
+                count=('Timestamp', 'size'), rating_n=('Rating', 'count'), rating_sum=('Rating', 'sum')
+            ).reset_index()
+            if daily.empty:
+                daily = pending_daily
+            elif not pending_daily.empty:
+                daily = pd.concat([daily, pending_daily]).groupby('day', as_index=False).sum()
+        daily.index = pd.to_datetime(daily.pop('day'))
+        if daily.empty:
+            return daily
+        full = pd.date_range(daily.index.min(), daily.index.max(), freq='D')
+        return daily.reindex(full, fill_value=0).rename_axis('day')
+
+    def rolling_average(self, window_days=7):
+        """Return the average rating over a trailing window of `window_days` days, per day."""
+        daily = self.daily_stats()
+        rolled = daily[['rating_sum', 'rating_n']].rolling(window_days, min_periods=1).sum()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (rolled['rating_sum'] / rolled['rating_n']).rename(f'avg_rating_{window_days}d')
+
+    def period_counts(self, freq='W'):
+        """Return the number of feedback rows per period (pandas frequency, e.g. 'W' or 'M')."""
+        freq = {'M': 'MS', 'Y': 'YS'}.get(freq, freq)
+        return self.daily_stats()['count'].resample(freq).sum()
+
+    def read(self):
+        """Return all feedback as a DataFrame."""
+        return self.query()
+
+
+def make_backend(name=None):
+    """Create the configured backend: FEEDBACK_BACKEND, else sheets when credentials exist."""
+    name = name or os.environ.get(BACKEND_ENV_VAR) or ("sheets" if has_sheets_credentials() else "local")
+    if name == "sheets":
+        return SheetsBackend()
+    if name == "local":
+        return LocalBackend()
+    raise ValueError(f"Unknown feedback backend: {name}")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_feedback_store():
+    """Return the process-wide feedback store with its flusher running."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = FeedbackStore(make_backend()).start()
+        return _store
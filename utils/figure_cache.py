@@ -0,0 +1,84 @@
+import io
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 64 * 1024 ** 2
+DEFAULT_DPI = 100
+
+
+class FigureCache:
+    """
+    Process-wide cache of rendered figures.
+
+    Entries are the encoded PNG/SVG bytes of a figure, keyed by whatever
+    determines its content (dataset fingerprint, plot type, parameters).
+    On a hit the figure is never constructed. Least recently used entries
+    are evicted once the total size exceeds `max_bytes`.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, key, draw, fmt='png', dpi=DEFAULT_DPI):
+        """
+        Return the encoded bytes for `key`, calling `draw()` on a miss.
+
+        `draw` must return a matplotlib Figure; it is closed after encoding.
+        """
+        full_key = (key, fmt, dpi)
+        with self._lock:
+            data = self._entries.get(full_key)
+            if data is not None:
+                self._entries.move_to_end(full_key)
+                self.hits += 1
+                return data
+
+        # pyplot is only needed to render a miss; importing it here keeps it
+        # off the import path of pages that use the cache
+        import matplotlib.pyplot as plt
+
+        fig = draw()
+        try:
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches='tight')
+        finally:
+            plt.close(fig)
+        data = buffer.getvalue()
+
+        with self._lock:
+            self.misses += 1
+            if full_key not in self._entries:
+                self._entries[full_key] = data
+                self._size += len(data)
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+        return data
+
+    def info(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'entries': len(self._entries), 'bytes': self._size}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+_cache = FigureCache()
+
+
+def render_cached(key, draw, fmt='png', dpi=DEFAULT_DPI):
+    """Render `draw()` through the shared figure cache and return the bytes."""
+    return _cache.get_or_render(key, draw, fmt=fmt, dpi=dpi)
+
+
+def figure_cache_info():
+    """Return hit/miss counters and the size of the shared figure cache."""
+    return _cache.info()
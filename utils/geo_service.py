@@ -0,0 +1,298 @@
+import os
+import json
+import threading
+import uuid
+from pathlib import Path
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# GeoParquet copy of a vector layer. The source (e.g. a shapefile) stays the
+# source of truth; the copy is rebuilt whenever any of its sidecar files
+# change (size or mtime differ), like the CSV store in data_store.
+VECTOR_DIR = Path(__file__).resolve().parent.parent / "data" / "vector_data"
+LOCAL_UNITS_PATH = VECTOR_DIR / "local_unit.shp"
+# Simplification tolerances as a fraction of the layer's extent. 1/1000 of
+# the extent is about one pixel on a 1000 px wide map.
+SIMPLIFY_LEVELS = {'high': 0.0002, 'medium': 0.001, 'low': 0.004}
+FULL_LEVEL = 'full'
+DEFAULT_WIDTH_PX = 800
+# Admin levels the local units are dissolved into, finest first:
+# level -> (key column, attribute columns carried over from the units)
+ADMIN_LEVELS = {
+    'district': ('DISTRICT', ['STATE_CODE', 'Province']),
+    'state': ('STATE_CODE', ['Province']),
+}
+UNIT_COL = 'GaPa_NaPa'
+_STAMP_KEY = b'source_stamp'
+# Files GDAL reads for a shapefile; other files sharing its stem (spatial
+# indexes, our .parquet copies and their .tmp files) don't affect the layer
+SHAPEFILE_PARTS = ('.shp', '.shx', '.dbf', '.prj', '.cpg')
+
+_layers = {}
+_hierarchies = {}
+_layers_lock = threading.Lock()
+
+
+def _source_stamp(path):
+    """Fingerprint every file of the layer (the parts of a shapefile, or the file itself)."""
+    path = Path(path)
+    parts = SHAPEFILE_PARTS if path.suffix.lower() == '.shp' else (path.suffix.lower(),)
+    files = sorted(p for p in path.parent.glob(f"{path.stem}.*") if p.suffix.lower() in parts)
+    if path not in files:
+        raise FileNotFoundError(f"Vector layer not found: {path}")
+    return {p.name: [p.stat().st_size, p.stat().st_mtime_ns] for p in files}
+
+
+def geoparquet_path_for(path, suffix=''):
+    """Return the location of the GeoParquet copy of a vector layer (or of a derived layer)."""
+    return Path(path).with_suffix(f'{suffix}.parquet')
+
+
+def _read_stamp(parquet_path):
+    try:
+        metadata = pq.read_schema(parquet_path).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    raw = metadata.get(_STAMP_KEY)
+    return json.loads(raw) if raw else None
+
+
+def build_geoparquet(path, parquet_path=None):
+    """
+    Convert a vector layer into GeoParquet with pre-simplified geometries.
+
+    Besides the full-resolution `geometry` column, one `geometry_<level>`
+    column is written per entry of SIMPLIFY_LEVELS, so map views never
+    simplify at render time.
+    """
+    import geopandas as gpd  # deferred: heavy, only needed on a rebuild
+
+    parquet_path = Path(parquet_path or geoparquet_path_for(path))
+    stamp = _source_stamp(path)
+    _write_geoparquet(_with_simplified(gpd.read_file(path)), parquet_path, stamp)
+    return parquet_path
+
+
+def _with_simplified(gdf, extent=None):
+    """Add one `geometry_<level>` column per simplification level."""
+    if extent is None:
+        minx, miny, maxx, maxy = gdf.total_bounds
+        extent = max(maxx - minx, maxy - miny)
+    gdf = gdf.copy()
+    for level, fraction in SIMPLIFY_LEVELS.items():
+        gdf[f'geometry_{level}'] = gdf.geometry.simplify(extent * fraction, preserve_topology=True)
+    return gdf
+
+
+def _write_geoparquet(gdf, parquet_path, stamp):
+    # geopandas writes the GeoParquet metadata; add the source stamp to it
+    tmp_path = parquet_path.with_name(f"{parquet_path.name}.{uuid.uuid4().hex}.tmp")
+    gdf.to_parquet(tmp_path, index=False)
+    table = pq.read_table(tmp_path)
+    metadata = dict(table.schema.metadata or {})
+    metadata[_STAMP_KEY] = json.dumps(stamp).encode()
+    pq.write_table(table.replace_schema_metadata(metadata), tmp_path)
+    os.replace(tmp_path, parquet_path)
+
+
+def ensure_geoparquet(path):
+    """Return the GeoParquet path for a layer, (re)building it if it is stale."""
+    parquet_path = geoparquet_path_for(path)
+    if _read_stamp(parquet_path) != _source_stamp(path):
+        build_geoparquet(path, parquet_path)
+    return parquet_path
+
+
+class GeoLayer:
+    """
+    A vector layer held in memory with its simplified variants and an
+    STRtree spatial index over the full-resolution geometries.
+
+    `layer(level)` returns a GeoDataFrame whose active geometry is one of
+    the pre-simplified levels; bbox and point lookups go through the index.
+    """
+
+    def __init__(self, frame, stamp):
+        geometry_columns = [c for c in frame.columns if c.startswith('geometry_')]
+        self.stamp = stamp
+        self.attributes = frame.drop(columns=['geometry', *geometry_columns])
+        self.frame = frame.drop(columns=geometry_columns)
+        self._levels = {FULL_LEVEL: self.frame}
+        for column in geometry_columns:
+            others = ['geometry', *(c for c in geometry_columns if c != column)]
+            level = frame.drop(columns=others).set_geometry(column).rename_geometry('geometry')
+            self._levels[column[len('geometry_'):]] = level
+        # Build the index up front so the first query does not pay for it
+        self.sindex = self.frame.sindex
+        minx, miny, maxx, maxy = self.frame.total_bounds
+        self.extent = max(maxx - minx, maxy - miny)
+
+    @property
+    def levels(self):
+        return list(self._levels)
+
+    def layer(self, level=FULL_LEVEL):
+        """Return the layer with the geometry of a simplification level."""
+        return self._levels[level]
+
+    def level_for(self, width_px=DEFAULT_WIDTH_PX):
+        """Return the coarsest level whose tolerance stays below one pixel at `width_px`."""
+        pixel = 1.0 / width_px
+        usable = [(f, level) for level, f in SIMPLIFY_LEVELS.items()
+                  if level in self._levels and f <= pixel]
+        return max(usable)[1] if usable else FULL_LEVEL
+
+    def query_bbox(self, minx, miny, maxx, maxy):
+        """Return the rows whose geometry intersects the bounding box."""
+        from shapely.geometry import box
+
+        positions = self.sindex.query(box(minx, miny, maxx, maxy), predicate='intersects')
+        return self.frame.iloc[np.sort(positions)]
+
+    def locate_points(self, xs, ys):
+        """
+        Return, for each point, the position of the row containing it
+        (-1 for points outside every geometry).
+        """
+        import shapely
+
+        points = shapely.points(np.asarray(xs, dtype=float), np.asarray(ys, dtype=float))
+        point_idx, row_idx = self.sindex.query(points, predicate='intersects')
+        result = np.full(len(points), -1, dtype=np.int64)
+        # Points on a shared border match several rows: keep the first
+        result[point_idx[::-1]] = row_idx[::-1]
+        return result
+
+    def locate(self, x, y):
+        """Return the attributes of the row containing a point, or None."""
+        position = self.locate_points([x], [y])[0]
+        return None if position < 0 else self.attributes.iloc[position]
+
+
+def get_layer(path=LOCAL_UNITS_PATH):
+    """
+    Return the process-wide GeoLayer for `path`.
+
+    The layer is read from its GeoParquet copy once and reloaded only when
+    the source files change.
+    """
+    import geopandas as gpd
+
+    path = Path(path)
+    stamp = _source_stamp(path)
+    with _layers_lock:
+        layer = _layers.get(path)
+        if layer is not None and layer.stamp == stamp:
+            return layer
+    layer = GeoLayer(gpd.read_parquet(ensure_geoparquet(path)), stamp)
+    with _layers_lock:
+        _layers[path] = layer
+    return layer
+
+
+def get_local_units():
+    """Return the local-unit layer of Nepal."""
+    return get_layer(LOCAL_UNITS_PATH)
+
+
+def dissolve_level(units, level):
+    """
+    Dissolve local units into the regions of an admin level.
+
+    Returns a GeoDataFrame with one row per region: its key, the carried
+    attributes, the number of local units and the names of the regions it
+    borders (`neighbors`, from an index query on the dissolved shapes).
+    """
+    key, carried = ADMIN_LEVELS[level]
+    carried = [c for c in carried if c in units.columns]
+    regions = units[[key, *carried, 'geometry']].dissolve(
+        by=key, aggfunc={c: 'first' for c in carried}, as_index=False
+    )
+    regions['n_units'] = units.groupby(key).size().reindex(regions[key]).to_numpy()
+
+    left, right = regions.sindex.query(regions.geometry, predicate='intersects')
+    keep = left != right
+    names = regions[key].to_numpy()
+    neighbors = [[] for _ in range(len(regions))]
+    for i, j in zip(left[keep], right[keep]):
+        neighbors[i].append(names[j])
+    regions['neighbors'] = [sorted(n) for n in neighbors]
+    return regions
+
+
+class AdminHierarchy:
+    """
+    Local units dissolved into districts and states.
+
+    `level(name)` is a GeoLayer of the dissolved regions (with simplified
+    variants and a spatial index), `units` maps every local unit to its
+    district and state, and `neighbors(level)` gives the region adjacency.
+    Aggregations by admin level are a groupby over `units`.
+    """
+
+    def __init__(self, units_layer, levels):
+        columns = [c for c in [UNIT_COL, *(key for key, _ in ADMIN_LEVELS.values())]
+                   if c in units_layer.attributes.columns]
+        self.stamp = units_layer.stamp
+        self.units = units_layer.attributes[columns]
+        self._levels = levels
+
+    def level(self, name):
+        return self._levels[name]
+
+    def neighbors(self, name):
+        """Return {region: [bordering regions]} for an admin level."""
+        key = ADMIN_LEVELS[name][0]
+        frame = self._levels[name].attributes
+        return {region: list(n) for region, n in zip(frame[key], frame['neighbors'])}
+
+    def parent_of(self, name, parent):
+        """Return a Series mapping each region of `name` to its region at `parent`."""
+        key, parent_key = ADMIN_LEVELS[name][0], ADMIN_LEVELS[parent][0]
+        return self.units.drop_duplicates(key).set_index(key)[parent_key]
+
+    def aggregate(self, values, level, how='mean'):
+        """
+        Aggregate per-local-unit `values` (aligned with `units`) to an admin level.
+        """
+        key = ADMIN_LEVELS[level][0]
+        return values.groupby(self.units[key].to_numpy()).agg(how)
+
+
+def build_admin_levels(path=LOCAL_UNITS_PATH):
+    """Dissolve the layer at every admin level into `<stem>.<level>.parquet`."""
+    path = Path(path)
+    stamp = _source_stamp(path)
+    units = get_layer(path)
+    for level in ADMIN_LEVELS:
+        regions = dissolve_level(units.frame, level)
+        # Simplify against the unit layer's extent so levels line up on one map
+        regions = _with_simplified(regions, extent=units.extent)
+        _write_geoparquet(regions, geoparquet_path_for(path, f'.{level}'), stamp)
+
+
+def get_admin_hierarchy(path=LOCAL_UNITS_PATH):
+    """
+    Return the process-wide AdminHierarchy for a local-unit layer.
+
+    The dissolved levels are computed once and stored next to the layer's
+    GeoParquet copy; they are rebuilt only when the source files change.
+    """
+    import geopandas as gpd
+
+    path = Path(path)
+    stamp = _source_stamp(path)
+    with _layers_lock:
+        hierarchy = _hierarchies.get(path)
+        if hierarchy is not None and hierarchy.stamp == stamp:
+            return hierarchy
+
+    level_paths = {level: geoparquet_path_for(path, f'.{level}') for level in ADMIN_LEVELS}
+    if any(_read_stamp(p) != stamp for p in level_paths.values()):
+        build_admin_levels(path)
+    levels = {level: GeoLayer(gpd.read_parquet(p), stamp) for level, p in level_paths.items()}
+    hierarchy = AdminHierarchy(get_layer(path), levels)
+    with _layers_lock:
+        _hierarchies[path] = hierarchy
+    return hierarchy
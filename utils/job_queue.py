@@ -0,0 +1,163 @@
+import os
+import time
+import uuid
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_MAX_WORKERS = max(1, min(2, (os.cpu_count() or 1) - 1))
+MAX_FINISHED_JOBS = 100
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+# Set inside a worker while it runs a job, so job functions can report progress
+_current_job = {}
+
+
+def report_progress(fraction, message=''):
+    """
+    Report progress (0..1) of the job running in this worker process.
+    Does nothing when called outside a job, so job functions can be run directly.
+    """
+    store = _current_job.get('store')
+    if store is not None:
+        store[_current_job['id']] = (float(fraction), message)
+
+
+def _run_job(job_id, progress_store, fn, args, kwargs):
+    _current_job.update(id=job_id, store=progress_store)
+    try:
+        report_progress(0.0, 'started')
+        result = fn(*args, **kwargs)
+        report_progress(1.0, 'finished')
+        return result
+    finally:
+        _current_job.clear()
+
+
+class Job:
+    """Bookkeeping for one submitted job."""
+
+    def __init__(self, job_id, key, description, future):
+        self.id = job_id
+        self.key = key
+        self.description = description
+        self.future = future
+        self.submitted_at = time.time()
+
+
+class JobQueue:
+    """
+    Local job scheduler backed by a bounded process pool.
+
+    Jobs get an id that can be polled with `status()`. Submitting a job with
+    the same `key` as one still pending or running returns the existing id
+    instead of scheduling duplicate work. Job functions persist their own
+    results (e.g. into the model registry) and return a small summary.
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS):
+        self.max_workers = max_workers
+        self._pool = ProcessPoolExecutor(max_workers=max_workers)
+        self._manager = None
+        self._progress = None
+        self._jobs = OrderedDict()  # job_id -> Job
+        self._in_flight = {}  # key -> job_id
+        self._lock = threading.RLock()  # done callbacks may fire inside submit()
+
+    def _progress_store(self):
+        # The manager process is only started once the first job is submitted
+        if self._manager is None:
+            self._manager = multiprocessing.Manager()
+            self._progress = self._manager.dict()
+        return self._progress
+
+    def submit(self, fn, *args, key=None, description='', **kwargs):
+        """Schedule `fn(*args, **kwargs)` in a worker process and return its job id."""
+        with self._lock:
+            if key is not None and key in self._in_flight:
+                existing = self._jobs.get(self._in_flight[key])
+                if existing is not None and not existing.future.done():
+                    return existing.id
+
+            job_id = uuid.uuid4().hex[:12]
+            future = self._pool.submit(_run_job, job_id, self._progress_store(), fn, args, kwargs)
+            self._jobs[job_id] = Job(job_id, key, description or getattr(fn, '__name__', ''), future)
+            if key is not None:
+                self._in_flight[key] = job_id
+            future.add_done_callback(lambda _, job_id=job_id: self._finished(job_id))
+            return job_id
+
+    def _finished(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and self._in_flight.get(job.key) == job_id:
+                del self._in_flight[job.key]
+            finished = [jid for jid, j in self._jobs.items() if j.future.done()]
+            for jid in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+                del self._jobs[jid]
+        if self._progress is not None:
+            self._progress.pop(job_id, None)
+
+    def status(self, job_id):
+        """Return a dict describing the state, progress and result of a job."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        future = job.future
+        info = {
+            'id': job.id,
+            'description': job.description,
+            'submitted_at': job.submitted_at,
+            'progress': 0.0,
+            'message': '',
+            'result': None,
+            'error': None,
+        }
+        if future.cancelled():
+            info['status'] = CANCELLED
+        elif future.done():
+            error = future.exception()
+            info['status'] = FAILED if error else DONE
+            info['progress'] = 1.0
+            if error:
+                info['error'] = str(error)
+            else:
+                info['result'] = future.result()
+        else:
+            info['status'] = RUNNING if future.running() else PENDING
+            if self._progress is not None:
+                info['progress'], info['message'] = self._progress.get(job_id, (0.0, ''))
+        return info
+
+    def cancel(self, job_id):
+        """Cancel a job that has not started yet. Returns True on success."""
+        job = self._jobs.get(job_id)
+        return job is not None and job.future.cancel()
+
+    def jobs(self):
+        """Return the status of every job still tracked by the queue."""
+        return [self.status(job_id) for job_id in list(self._jobs)]
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+        if self._manager is not None:
+            self._manager.shutdown()
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Return the process-wide job queue, creating it on first use."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
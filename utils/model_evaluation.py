@@ -1,25 +1,71 @@
-import os
-import joblib
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from sklearn.metrics import mean_squared_error, r2_score
+from utils.model_registry import load_artifact, scaler_from_state
+from utils.feature_engineering import FeaturePipeline
+from utils.preprocess import preprocess_data, split_indices, TEST_SIZE, RANDOM_STATE
 
-def load_model(model_name='linear_regression'):
+def load_model(model_name='linear_regression', version=None):
     """
-    Load a trained model from disk.
+    Load a trained model from the model registry.
     """
-    model_path = os.path.join(os.path.dirname(__file__), '..', 'models', f"{model_name}.pkl")
-    if os.path.exists(model_path):
-        return joblib.load(model_path)
-    else:
-        raise FileNotFoundError(f"Model file {model_path} not found.")
+    return load_artifact(model_name, version)[0]
+
+def load_model_with_manifest(model_name='linear_regression', version=None):
+    """
+    Load a trained model and its manifest, memory-mapping large arrays.
+    """
+    return load_artifact(model_name, version, mmap_mode='r')
+
+def apply_feature_pipeline(raw_df, manifest):
+    """
+    Rebuild a model's input frame from raw data with the feature pipeline
+    stored in its manifest. Returns None if the model has no pipeline.
+    """
+    state = manifest.get('feature_pipeline')
+    if not state:
+        return None
+    return FeaturePipeline.from_dict(state).transform(raw_df)
+
+def prepare_test_data(df, manifest, target_col):
+    """
+    Rebuild the test split a model was trained on.
+
+    The split parameters and fitted scaler come from the manifest, so the
+    scaler is not refit. Raises ValueError if the data does not match the
+    model's target or features.
+    """
+    trained_target = manifest.get('target')
+    if trained_target is not None and trained_target != target_col:
+        raise ValueError(f"Model was trained to predict '{trained_target}', not '{target_col}'.")
+
+    test_size = manifest.get('test_size', TEST_SIZE)
+    random_state = manifest.get('random_state', RANDOM_STATE)
+    scaler = scaler_from_state(manifest.get('scaler'))
+    if scaler is None:
+        # Models saved before the registry carry no scaler: use the shared split
+        _, X_test, _, y_test, _ = preprocess_data(df, target_col, test_size, random_state)
+        return X_test, y_test
+
+    features = manifest.get('features') or [c for c in df.columns if c != target_col]
+    missing = [c for c in features if c not in df.columns]
+    if missing:
+        raise ValueError(f"Data is missing features the model was trained with: {missing}")
+
+    _, test_idx = split_indices(df, target_col, test_size, random_state)
+    X_test = df[features].iloc[test_idx]
+    num_cols = list(scaler.feature_names_in_)
+    X_test[num_cols] = scaler.transform(X_test[num_cols])
+    y_test = df[target_col].iloc[test_idx]
+    return X_test, y_test
 
 def evaluate_predictions(model, X_test, y_test):
     """
     Evaluate model performance on test data.
     """
     predictions = model.predict(X_test)
-    rmse = mean_squared_error(y_test, predictions)
+    rmse = np.sqrt(mean_squared_error(y_test, predictions))
     r2 = r2_score(y_test, predictions)
     return predictions, {'RMSE': rmse, 'R2 Score': r2}
 
@@ -0,0 +1,191 @@
+import os
+import json
+import shutil
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+import joblib
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+# Layout:
+#   models/<name>/v0001/model.joblib
+#   models/<name>/v0001/manifest.json
+# A version only counts once its manifest is written. Bare models/<name>.pkl
+# files from before the registry are still readable as version 0.
+MODELS_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
+MODEL_FILENAME = 'model.joblib'
+MANIFEST_FILENAME = 'manifest.json'
+LEGACY_SUFFIX = '.pkl'
+MODEL_CACHE_SIZE = 8
+_model_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_version_lock = threading.Lock()
+
+def _version_dir(name, version, models_dir=MODELS_DIR):
+    return os.path.join(models_dir, name, f'v{version:04d}')
+
+def _legacy_path(name, models_dir=MODELS_DIR):
+    return os.path.join(models_dir, f'{name}{LEGACY_SUFFIX}')
+
+def _json_default(value):
+    """Make numpy scalars/arrays JSON serializable."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+def scaler_state(scaler):
+    """Return the fitted parameters of a StandardScaler as plain lists."""
+    if scaler is None or not hasattr(scaler, 'mean_'):
+        return None
+    columns = getattr(scaler, 'feature_names_in_', None)
+    return {
+        'columns': list(columns) if columns is not None else None,
+        'mean': scaler.mean_.tolist(),
+        'scale': scaler.scale_.tolist(),
+        'var': scaler.var_.tolist(),
+        'n_samples_seen': int(np.max(scaler.n_samples_seen_)),
+    }
+
+def scaler_from_state(state):
+    """Rebuild a fitted StandardScaler from `scaler_state` output."""
+    if not state:
+        return None
+    scaler = StandardScaler()
+    scaler.mean_ = np.asarray(state['mean'], dtype=float)
+    scaler.scale_ = np.asarray(state['scale'], dtype=float)
+    scaler.var_ = np.asarray(state['var'], dtype=float)
+    scaler.n_samples_seen_ = state['n_samples_seen']
+    scaler.n_features_in_ = len(scaler.mean_)
+    if state.get('columns') is not None:
+        scaler.feature_names_in_ = np.asarray(state['columns'], dtype=object)
+    return scaler
+
+def list_versions(name, models_dir=MODELS_DIR):
+    """Return the complete versions stored for a model name, oldest first."""
+    model_root = os.path.join(models_dir, name)
+    if not os.path.isdir(model_root):
+        return []
+    versions = []
+    for entry in os.listdir(model_root):
+        if entry.startswith('v') and entry[1:].isdigit() and \
+                os.path.exists(os.path.join(model_root, entry, MANIFEST_FILENAME)):
+            versions.append(int(entry[1:]))
+    return sorted(versions)
+
+def latest_version(name, models_dir=MODELS_DIR):
+    """Return the newest version number, 0 for a legacy .pkl, or None."""
+    versions = list_versions(name, models_dir)
+    if versions:
+        return versions[-1]
+    if os.path.exists(_legacy_path(name, models_dir)):
+        return 0
+    return None
+
+def register_model(model, name, features=None, target=None, scaler=None, data_fingerprint=None,
+                   metrics=None, extra=None, compress=0, models_dir=MODELS_DIR):
+    """
+    Store a model as a new version together with its manifest.
+
+    Leave `compress` at 0 for large models so they can be loaded with
+    `mmap_mode`; compressed artifacts are always read fully into memory.
+    Returns the written manifest.
+    """
+    model_root = os.path.join(models_dir, name)
+    os.makedirs(model_root, exist_ok=True)
+
+    # Claim the next version directory; mkdir fails if another writer won
+    with _version_lock:
+        existing = [int(e[1:]) for e in os.listdir(model_root) if e.startswith('v') and e[1:].isdigit()]
+        version = max(existing, default=0) + 1
+        while True:
+            version_dir = _version_dir(name, version, models_dir)
+            try:
+                os.mkdir(version_dir)
+                break
+            except FileExistsError:
+                version += 1
+
+    manifest = {
+        'name': name,
+        'version': version,
+        'model_type': type(model).__name__,
+        'features': list(features) if features is not None else None,
+        'target': target,
+        'scaler': scaler_state(scaler),
+        'data_fingerprint': data_fingerprint,
+        'metrics': metrics or {},
+        'trained_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'compress': compress,
+        **(extra or {}),
+    }
+    try:
+        joblib.dump(model, os.path.join(version_dir, MODEL_FILENAME), compress=compress)
+        tmp_manifest = os.path.join(version_dir, f'{MANIFEST_FILENAME}.tmp')
+        with open(tmp_manifest, 'w') as f:
+            json.dump(manifest, f, indent=2, default=_json_default)
+        os.replace(tmp_manifest, os.path.join(version_dir, MANIFEST_FILENAME))
+    except Exception:
+        shutil.rmtree(version_dir, ignore_errors=True)
+        raise
+    return manifest
+
+def load_manifest(name, version=None, models_dir=MODELS_DIR):
+    """Return the manifest of a model version (the latest by default)."""
+    if version is None:
+        version = latest_version(name, models_dir)
+    if version is None:
+        raise FileNotFoundError(f"Model '{name}' not found in {models_dir}.")
+    if version == 0:
+        if not os.path.exists(_legacy_path(name, models_dir)):
+            raise FileNotFoundError(f"Model '{name}' not found in {models_dir}.")
+        return {'name': name, 'version': 0, 'legacy': True, 'features': None,
+                'target': None, 'scaler': None, 'compress': None}
+    manifest_path = os.path.join(_version_dir(name, version, models_dir), MANIFEST_FILENAME)
+    if not os.path.exists(manifest_path):
+        raise FileNotFoundError(f"Model '{name}' version {version} not found.")
+    with open(manifest_path) as f:
+        return json.load(f)
+
+def artifact_path(name, version, models_dir=MODELS_DIR):
+    """Return the file holding the serialized model of a version."""
+    if version == 0:
+        return _legacy_path(name, models_dir)
+    return os.path.join(_version_dir(name, version, models_dir), MODEL_FILENAME)
+
+def load_artifact(name, version=None, mmap_mode=None, models_dir=MODELS_DIR):
+    """
+    Return `(model, manifest)` for a model version (the latest by default).
+
+    Deserialized models are kept in a small in-process LRU cache, so repeated
+    loads of the same version skip unpickling. `mmap_mode` (e.g. 'r') maps
+    the numpy arrays of uncompressed artifacts instead of reading them.
+    """
+    manifest = load_manifest(name, version, models_dir)
+    version = manifest['version']
+    if manifest.get('compress'):
+        mmap_mode = None  # joblib cannot memory-map compressed files
+
+    key = (os.path.abspath(models_dir), name, version, mmap_mode)
+    with _cache_lock:
+        if key in _model_cache:
+            _model_cache.move_to_end(key)
+            return _model_cache[key], manifest
+
+    model = joblib.load(artifact_path(name, version, models_dir), mmap_mode=mmap_mode)
+    with _cache_lock:
+        _model_cache[key] = model
+        while len(_model_cache) > MODEL_CACHE_SIZE:
+            _model_cache.popitem(last=False)
+    return model, manifest
+
+def load_model(name, version=None, mmap_mode=None, models_dir=MODELS_DIR):
+    """Return the deserialized model of a version (the latest by default)."""
+    return load_artifact(name, version, mmap_mode, models_dir)[0]
+
+def clear_model_cache():
+    """Drop every deserialized model held in memory."""
+    with _cache_lock:
+        _model_cache.clear()
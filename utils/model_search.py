@@ -0,0 +1,256 @@
+import time
+import threading
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from sklearn.model_selection import ParameterGrid
+from sklearn.metrics import mean_squared_error, r2_score
+from utils.model_training import train_model, evaluate_model, save_model
+from utils.preprocess import preprocess_data, split_indices, dataset_fingerprint, TEST_SIZE, RANDOM_STATE
+
+PARAM_GRIDS = {
+    'Linear Regression': {
+        'fit_intercept': [True, False],
+        'positive': [False, True],
+    },
+    'Random Forest': {
+        'n_estimators': [50, 100, 200],
+        'max_depth': [5, 10, 20, None],
+        'min_samples_leaf': [1, 3],
+    },
+}
+
+SEARCH_STRATEGIES = ['Successive Halving', 'Grid']
+DEFAULT_N_SPLITS = 4
+DEFAULT_ETA = 3
+
+
+def parameter_candidates(model_types, param_grids=PARAM_GRIDS):
+    """Expand the parameter grids of the chosen model types into candidates."""
+    return [
+        (model_type, params)
+        for model_type in model_types
+        for params in ParameterGrid(param_grids[model_type])
+    ]
+
+
+def time_series_folds(years, n_splits=DEFAULT_N_SPLITS):
+    """
+    Build expanding-window folds over `year`.
+
+    The distinct years are cut into n_splits + 1 contiguous blocks; fold k
+    trains on blocks 0..k and validates on block k + 1, so a fold never
+    trains on years later than the ones it is scored on.
+    """
+    years = np.asarray(years)
+    unique_years = np.unique(years)
+    n_splits = min(n_splits, len(unique_years) - 1)
+    if n_splits < 1:
+        raise ValueError("At least two distinct years are needed for time-series folds.")
+
+    blocks = np.array_split(unique_years, n_splits + 1)
+    folds = []
+    for k in range(n_splits):
+        train_years = np.concatenate(blocks[:k + 1])
+        val_years = blocks[k + 1]
+        folds.append((
+            np.flatnonzero(np.isin(years, train_years)),
+            np.flatnonzero(np.isin(years, val_years)),
+        ))
+    return folds
+
+
+# Training data shared with pool workers once, instead of pickled per task
+_worker_data = {}
+
+
+def _init_worker(X, y):
+    _worker_data['X'] = X
+    _worker_data['y'] = y
+
+
+def _fit_and_score(candidate_id, model_type, params, fold_id, train_idx, val_idx):
+    """Fit one candidate on one fold and return its validation scores."""
+    X, y = _worker_data['X'], _worker_data['y']
+    start = time.perf_counter()
+    model = train_model(X[train_idx], y[train_idx], model_type=model_type, **params)
+    predictions = model.predict(X[val_idx])
+    return {
+        'candidate': candidate_id,
+        'model_type': model_type,
+        'params': params,
+        'fold': fold_id,
+        'RMSE': np.sqrt(mean_squared_error(y[val_idx], predictions)),
+        'R2 Score': r2_score(y[val_idx], predictions),
+        'fit_time': time.perf_counter() - start,
+    }
+
+
+class SearchJob:
+    """
+    Hyperparameter search running in a background thread.
+
+    Fold evaluations are spread over a process pool; finished folds are
+    appended to `results` as they arrive, so callers can poll
+    `leaderboard()` while the search runs. `cancel()` stops scheduling new
+    work and drops queued folds.
+    """
+
+    def __init__(self, df, target_col, model_types, strategy='Successive Halving',
+                 n_jobs=2, n_splits=DEFAULT_N_SPLITS, eta=DEFAULT_ETA, year_col='year',
+                 pipeline=None):
+        self.df = df
+        self.pipeline = pipeline
+        self.target_col = target_col
+        self.model_types = list(model_types)
+        self.strategy = strategy
+        self.n_jobs = max(1, int(n_jobs))
+        self.n_splits = n_splits
+        self.eta = eta
+        self.year_col = year_col
+
+        self.status = 'pending'
+        self.error = None
+        self.results = []
+        self.best = None
+        self.manifest = None
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='model-search', daemon=True)
+        self.status = 'running'
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def done(self):
+        return self.status in ('done', 'cancelled', 'failed')
+
+    def leaderboard(self):
+        """Return per-candidate mean scores over the folds finished so far."""
+        with self._lock:
+            records = list(self.results)
+        if not records:
+            return pd.DataFrame(columns=['model_type', 'params', 'folds', 'RMSE', 'R2 Score'])
+        frame = pd.DataFrame(records)
+        frame['params'] = frame['params'].map(lambda p: str(dict(sorted(p.items()))))
+        board = (
+            frame.groupby(['candidate', 'model_type', 'params'])
+            .agg(folds=('fold', 'count'), RMSE=('RMSE', 'mean'), **{'R2 Score': ('R2 Score', 'mean')})
+            .reset_index()
+            .sort_values(['folds', 'RMSE'], ascending=[False, True])
+        )
+        return board.drop(columns='candidate').reset_index(drop=True)
+
+    def results_table(self):
+        """Return every (candidate, fold) result recorded so far."""
+        with self._lock:
+            return pd.DataFrame(list(self.results))
+
+    def _rungs(self, n_folds):
+        """Yield the number of folds used by each round of the search."""
+        if self.strategy == 'Grid':
+            yield n_folds
+            return
+        resource = 1
+        while resource < n_folds:
+            yield resource
+            resource *= self.eta
+        yield n_folds
+
+    def _run(self):
+        try:
+            X_train, X_test, y_train, y_test, scaler = preprocess_data(self.df, self.target_col)
+            train_idx, _ = split_indices(self.df, self.target_col)
+            if self.year_col in self.df.columns:
+                years = self.df[self.year_col].to_numpy()[train_idx]
+            else:
+                years = np.arange(len(train_idx))
+
+            # Most recent folds first: they are the most relevant for forecasting
+            folds = time_series_folds(years, self.n_splits)[::-1]
+            candidates = dict(enumerate(parameter_candidates(self.model_types)))
+            X = X_train.to_numpy(dtype=float)
+            y = y_train.to_numpy(dtype=float)
+
+            with ProcessPoolExecutor(max_workers=self.n_jobs, initializer=_init_worker, initargs=(X, y)) as pool:
+                scored_folds = 0
+                for n_folds in self._rungs(len(folds)):
+                    self._evaluate(pool, candidates, folds, scored_folds, n_folds)
+                    scored_folds = n_folds
+                    if self._cancel.is_set():
+                        break
+                    candidates = self._survivors(candidates, n_folds)
+
+            if self._cancel.is_set():
+                self.status = 'cancelled'
+                return
+
+            # Refit the winner on the full training split and save it with the results
+            candidate_id = next(iter(candidates))
+            model_type, params = candidates[candidate_id]
+            model = train_model(X_train, y_train, model_type=model_type, **params)
+            metrics = evaluate_model(model, X_test, y_test)
+            self.best = {'model_type': model_type, 'params': params, 'metrics': metrics}
+            self.manifest = save_model(
+                model,
+                model_name=model_type.replace(" ", "_").lower(),
+                features=list(X_train.columns),
+                target=self.target_col,
+                scaler=scaler,
+                data_fingerprint=dataset_fingerprint(self.df),
+                metrics=metrics,
+                extra={
+                    'params': params,
+                    'test_size': TEST_SIZE,
+                    'random_state': RANDOM_STATE,
+                    'feature_pipeline': self.pipeline,
+                    'search': {'strategy': self.strategy, 'n_splits': len(folds), 'eta': self.eta},
+                    'search_results': self.results_table().to_dict(orient='records'),
+                },
+            )
+            self.status = 'done'
+        except Exception as e:
+            self.error = str(e)
+            self.status = 'failed'
+
+    def _evaluate(self, pool, candidates, folds, first_fold, last_fold):
+        """Score every candidate on folds[first_fold:last_fold]."""
+        tasks = [
+            (cid, model_type, params, fold_id, *folds[fold_id])
+            for cid, (model_type, params) in candidates.items()
+            for fold_id in range(first_fold, last_fold)
+        ]
+        # Keep a bounded number of tasks queued so cancellation takes effect quickly
+        pending = set()
+        tasks = iter(tasks)
+        while True:
+            while len(pending) < 2 * self.n_jobs and not self._cancel.is_set():
+                task = next(tasks, None)
+                if task is None:
+                    break
+                pending.add(pool.submit(_fit_and_score, *task))
+            if not pending:
+                return
+            finished, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+            for future in finished:
+                with self._lock:
+                    self.results.append(future.result())
+            if self._cancel.is_set():
+                for future in pending:
+                    future.cancel()
+                return
+
+    def _survivors(self, candidates, n_folds):
+        """Keep the best 1/eta candidates by mean RMSE over the first n_folds folds."""
+        with self._lock:
+            frame = pd.DataFrame(list(self.results))
+        frame = frame[frame['candidate'].isin(candidates) & (frame['fold'] < n_folds)]
+        ranking = frame.groupby('candidate')['RMSE'].mean().sort_values()
+        keep = max(1, len(ranking) // self.eta) if self.strategy != 'Grid' else len(ranking)
+        return {cid: candidates[cid] for cid in ranking.index[:keep]}
@@ -1,9 +1,11 @@
+import numpy as np
 import pandas as pd
 from sklearn.linear_model import LinearRegression
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error, r2_score
-import joblib
-import os
+from utils.model_registry import register_model
+from utils.job_queue import report_progress
+from utils.preprocess import preprocess_data, dataset_fingerprint, TEST_SIZE, RANDOM_STATE
 
 
 
@@ -25,17 +27,45 @@ def evaluate_model(model, X_test, y_test):
     #Evaluate the trained model using test data.
 
     predictions = model.predict(X_test)
-    rmse = mean_squared_error(y_test, predictions)
+    rmse = np.sqrt(mean_squared_error(y_test, predictions))
     r2 = r2_score(y_test, predictions)
     return {'RMSE': rmse, 'R2 Score': r2}
 
-def save_model(model, model_name='trained_model'):
+def save_model(model, model_name='trained_model', **manifest):
     """
-    Save the trained model.
+    Save the trained model as a new registry version.
 
-    
+    Extra keyword arguments (features, target, scaler, data_fingerprint,
+    metrics, ...) are recorded in the version's manifest.
     """
-    models_dir = os.path.join(os.path.dirname(__file__), '..', 'models')
-    os.makedirs(models_dir, exist_ok=True)
-    model_path = os.path.join(models_dir, f"{model_name}.pkl")
-    joblib.dump(model, model_path)
+    return register_model(model, model_name, **manifest)
+
+def train_and_save(df, target_col, model_type='Linear Regression', params=None, pipeline=None):
+    """
+    Preprocess, train, evaluate and save a model in one call.
+
+    Meant to run as a background job: progress is reported to the job queue
+    and only the metrics and manifest are returned to the caller.
+    `pipeline` is the serialized FeaturePipeline that produced `df` from the
+    raw data; it is stored in the manifest so the features can be rebuilt.
+    """
+    params = params or {}
+    report_progress(0.1, 'preprocessing')
+    X_train, X_test, y_train, y_test, scaler = preprocess_data(df, target_col=target_col)
+    report_progress(0.2, 'fitting')
+    model = train_model(X_train, y_train, model_type=model_type, **params)
+    report_progress(0.8, 'evaluating')
+    metrics = evaluate_model(model, X_test, y_test)
+    report_progress(0.9, 'saving')
+    manifest = save_model(
+        model,
+        model_name=model_type.replace(" ", "_").lower(),
+        features=list(X_train.columns),
+        target=target_col,
+        scaler=scaler,
+        data_fingerprint=dataset_fingerprint(df),
+        metrics=metrics,
+        extra={'params': params, 'test_size': TEST_SIZE, 'random_state': RANDOM_STATE,
+               'feature_pipeline': pipeline},
+    )
+    return {'metrics': metrics, 'manifest': manifest}
@@ -0,0 +1,209 @@
+import json
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from utils.model_registry import load_artifact, scaler_from_state
+from utils.feature_engineering import FeaturePipeline
+from utils.preprocess import preprocess_data, dataset_fingerprint
+
+FORECAST_MODELS = ('linear_regression', 'random_forest')
+DEFAULT_TARGET = 'avg_max_temp'
+DEFAULT_HORIZON = 2050
+YEAR_COL = 'year'
+# Covariates a scenario does not change are held at their last observed
+# value, or extrapolated along the linear trend of the last TREND_WINDOW years
+HOLD, TREND = 'hold', 'trend'
+TREND_WINDOW = 10
+FORECAST_CACHE_SIZE = 32
+_forecast_cache = OrderedDict()
+_forecast_stats = {'hits': 0, 'misses': 0}
+_forecast_lock = threading.Lock()
+
+
+def make_scenario(name, changes=None, default=HOLD):
+    """
+    Build a scenario spec.
+
+    `changes` maps covariate -> annual % change (e.g. {'fertilizer_kg_per_ha': 3})
+    or TREND; covariates not listed follow `default` (HOLD or TREND).
+    """
+    return {'name': str(name), 'changes': dict(changes or {}), 'default': default}
+
+
+def scenario_key(scenarios):
+    """Return a canonical string for a batch of scenario specs (order matters)."""
+    return json.dumps(
+        [make_scenario(s['name'], s.get('changes'), s.get('default', HOLD)) for s in scenarios],
+        sort_keys=True, default=float,
+    )
+
+
+def future_years(history, horizon=DEFAULT_HORIZON):
+    """Return the years after the last observed year up to `horizon` (inclusive)."""
+    last_year = int(history[YEAR_COL].max())
+    return np.arange(last_year + 1, int(horizon) + 1)
+
+
+def trend_slopes(history, columns, window=TREND_WINDOW):
+    """Return the per-year linear slope of each column over the last `window` years."""
+    recent = history.sort_values(YEAR_COL).tail(window)
+    if len(recent) < 2:
+        return pd.Series(0.0, index=columns)
+    # One least-squares fit for all columns at once
+    slopes = np.polyfit(recent[YEAR_COL].to_numpy(dtype=float), recent[columns].to_numpy(dtype=float), 1)[0]
+    return pd.Series(slopes, index=columns)
+
+
+def project_covariates(history, years, scenarios, target=None, window=TREND_WINDOW):
+    """
+    Project raw covariates for every (scenario, year) pair.
+
+    Returns one frame with the history's columns and len(scenarios) *
+    len(years) rows, scenario-major, plus `scenario` and `year` keys. The
+    values are computed as (scenario, year, column) arrays, not row by row.
+    """
+    history = history.sort_values(YEAR_COL)
+    years = np.asarray(years)
+    last = history.iloc[-1]
+    offsets = (years - int(last[YEAR_COL])).astype(float)
+    columns = [c for c in history.select_dtypes(include='number').columns if c not in (YEAR_COL, target)]
+
+    unknown = sorted({c for s in scenarios for c in s.get('changes', {})} - set(columns))
+    if unknown:
+        raise ValueError(f"Scenario covariates not in the data: {unknown}")
+
+    # rates[s, c]: annual % change; trend[s, c]: follow the linear trend instead
+    rates = np.zeros((len(scenarios), len(columns)))
+    trend = np.zeros((len(scenarios), len(columns)), dtype=bool)
+    for i, scenario in enumerate(scenarios):
+        trend[i] = scenario.get('default', HOLD) == TREND
+        for col, change in scenario.get('changes', {}).items():
+            j = columns.index(col)
+            trend[i, j] = change == TREND
+            rates[i, j] = 0.0 if change == TREND or pd.isna(change) else float(change)
+
+    base = last[columns].to_numpy(dtype=float)
+    grown = base * (1 + rates[:, None, :] / 100) ** offsets[None, :, None]
+    trended = base + trend_slopes(history, columns, window).to_numpy() * offsets[None, :, None]
+    values = np.where(trend[:, None, :], trended, grown).reshape(-1, len(columns))
+
+    n = len(scenarios) * len(years)
+    future = history.iloc[np.full(n, len(history) - 1)].reset_index(drop=True)
+    future[columns] = values
+    future[YEAR_COL] = np.tile(years, len(scenarios)).astype(history[YEAR_COL].dtype)
+    if target in future.columns:
+        future[target] = np.nan
+    future.insert(0, 'scenario', np.repeat([s['name'] for s in scenarios], len(years)))
+    return future
+
+
+def model_target(model_name, version, columns):
+    """
+    Return the column a model version predicts.
+
+    Older models don't record it: it is then the one data column (other
+    than the year) missing from the model's features, or None if ambiguous.
+    """
+    model, manifest = load_artifact(model_name, version)
+    if manifest.get('target'):
+        return manifest['target']
+    features = set(manifest.get('features') or getattr(model, 'feature_names_in_', []))
+    candidates = [c for c in columns if c != YEAR_COL and c not in features]
+    return candidates[0] if features and len(candidates) == 1 else None
+
+
+def _model_inputs(model, manifest, history, target):
+    """Return (feature pipeline or None, features, scaler) for a model version."""
+    pipeline_state = manifest.get('feature_pipeline')
+    pipeline = FeaturePipeline.from_dict(pipeline_state) if pipeline_state else None
+    features = manifest.get('features')
+    if features is None:
+        features = list(getattr(model, 'feature_names_in_', []))
+    if not features:
+        raise ValueError("The model records no feature names; retrain it to forecast.")
+    if target in features:
+        raise ValueError(f"The model uses '{target}' as an input, so it cannot forecast it.")
+    scaler = scaler_from_state(manifest.get('scaler'))
+    if scaler is None:
+        # Models saved before the registry carry no scaler: refit it on the shared split
+        engineered = pipeline.transform(history) if pipeline is not None else history
+        scaler = preprocess_data(engineered, target)[4]
+    return pipeline, features, scaler
+
+
+def build_design_matrix(history, years, scenarios, model, manifest, target):
+    """
+    Build the model input for a batch of scenarios as one 2-D matrix.
+
+    Covariates are projected, run through the model's feature pipeline and
+    scaler once for the whole batch. Returns (X, keys) where `keys` holds
+    the scenario and year of each row.
+    """
+    future = project_covariates(history, years, scenarios, target)
+    pipeline, features, scaler = _model_inputs(model, manifest, history, target)
+    keys = future[['scenario', YEAR_COL]]
+    X = future.drop(columns='scenario')
+    if pipeline is not None:
+        X = pipeline.transform(X)
+    missing = [c for c in features if c not in X.columns]
+    if missing:
+        raise ValueError(f"Projected data is missing features the model was trained with: {missing}")
+    num_cols = list(scaler.feature_names_in_)
+    X[num_cols] = scaler.transform(X[num_cols])
+    return X[features], keys
+
+
+def forecast(history, scenarios, horizon=DEFAULT_HORIZON, model_name='linear_regression',
+             version=None, target=None):
+    """
+    Predict the target for every scenario and future year (uncached).
+
+    Returns a long frame with `scenario`, `year` and `prediction`.
+    """
+    model, manifest = load_artifact(model_name, version)
+    target = model_target(model_name, version, history.columns) or target or DEFAULT_TARGET
+    X, keys = build_design_matrix(history, future_years(history, horizon), scenarios, model, manifest, target)
+    result = keys.copy()
+    result['prediction'] = model.predict(X)  # one call for the whole batch
+    return result
+
+
+def get_forecast(history, scenarios, horizon=DEFAULT_HORIZON, model_name='linear_regression',
+                 version=None, target=None):
+    """
+    Return the forecast for a scenario batch, memoized.
+
+    Results are cached on (model name and version, target, scenario spec,
+    horizon, data fingerprint); a newly trained version is a new key.
+    """
+    manifest_version = load_artifact(model_name, version)[1]['version']
+    key = (model_name, manifest_version, target, scenario_key(scenarios), int(horizon),
+           dataset_fingerprint(history))
+    with _forecast_lock:
+        result = _forecast_cache.get(key)
+        if result is not None:
+            _forecast_cache.move_to_end(key)
+            _forecast_stats['hits'] += 1
+            return result.copy(deep=False)
+
+    result = forecast(history, scenarios, horizon, model_name, manifest_version, target)
+    with _forecast_lock:
+        _forecast_stats['misses'] += 1
+        _forecast_cache[key] = result
+        while len(_forecast_cache) > FORECAST_CACHE_SIZE:
+            _forecast_cache.popitem(last=False)
+    return result.copy(deep=False)
+
+
+def forecast_cache_info():
+    """Return hit/miss counters and the current size of the forecast cache."""
+    with _forecast_lock:
+        return {**_forecast_stats, 'size': len(_forecast_cache), 'maxsize': FORECAST_CACHE_SIZE}
+
+
+def clear_forecast_cache():
+    """Drop all memoized forecasts and reset the counters."""
+    with _forecast_lock:
+        _forecast_cache.clear()
+        _forecast_stats.update(hits=0, misses=0)
@@ -1,31 +1,66 @@
 import os
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
-import joblib
 import streamlit as st
+from utils.data_store import read_store, source_stamp
+from utils.model_registry import register_model, load_model as registry_load_model
 
-# Cache the data to prevent reloading
-@st.cache_data
-def load_data(file_path=None):
-    """Load the climate dataset from CSV."""
-    if file_path is None:
-        file_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'processed_data.csv')
-    
+DATA_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'processed_data.csv')
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+SPLIT_CACHE_SIZE = 32
+_split_cache = OrderedDict()
+_split_stats = {'hits': 0, 'misses': 0}
+_split_lock = threading.Lock()
+
+def data_stamp(file_path=None):
+    """Return the (size, mtime) stamp of the source CSV, used to key caches built from it."""
+    stamp = source_stamp(file_path or DATA_PATH)
+    return stamp['size'], stamp['mtime_ns']
+
+def load_data(file_path=None, columns=None, year_range=None):
+    """
+    Load the climate dataset.
+
+    The CSV is converted once into a memory-mapped Parquet store (rebuilt
+    when the CSV changes). `columns` limits which columns are read and
+    `year_range` is an inclusive (start, end) tuple; either end may be None.
+    """
+    file_path = file_path or DATA_PATH
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"No data file found at: {file_path}")
 
-    data = pd.read_csv(file_path)
-    data['year'] = data['year'].astype(int)  # ensure 'year' is integer
-    return data
+    return _load_data(file_path, columns, year_range, data_stamp(file_path))
 
-def preprocess_data(data, target_col='avg_max_temp', test_size=0.2, random_state=42):
-    """Split data and scale numeric features."""
+# Cache the data to prevent reloading; `stamp` is only part of the key, so an
+# edited CSV misses the cache and goes through the rebuilt store
+@st.cache_data
+def _load_data(file_path, columns, year_range, stamp):
+    return read_store(file_path, columns=columns, year_range=year_range)
+
+def dataset_fingerprint(data):
+    """Return a content hash of a DataFrame (values, index, columns and dtypes)."""
+    row_hashes = pd.util.hash_pandas_object(data, index=True).to_numpy()
+    digest = hashlib.sha1(row_hashes.tobytes())
+    digest.update(repr([(str(c), str(t)) for c, t in data.dtypes.items()]).encode())
+    return digest.hexdigest()
+
+def _split_and_scale(data, target_col, test_size, random_state):
+    """Split data and scale numeric features (uncached)."""
     X = data.drop(columns=[target_col])
     y = data[target_col]
 
-    # Split into train and test sets
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=random_state)
+    # Split positions rather than frames so the split can be stored compactly
+    train_idx, test_idx = _split_positions(len(data), test_size, random_state)
+    # iloc already copies the rows; the shallow copy detaches the subsets
+    # from X so the scaled columns below replace theirs without a warning
+    X_train, X_test = X.iloc[train_idx].copy(deep=False), X.iloc[test_idx].copy(deep=False)
+    y_train, y_test = y.iloc[train_idx], y.iloc[test_idx]
 
     # Scale only numeric columns
     scaler = StandardScaler()
@@ -33,19 +68,77 @@ def preprocess_data(data, target_col='avg_max_temp', test_size=0.2, random_state
     X_train[num_cols] = scaler.fit_transform(X_train[num_cols])
     X_test[num_cols] = scaler.transform(X_test[num_cols])
 
-    return X_train, X_test, y_train, y_test, scaler
+    return {
+        'train_idx': train_idx,
+        'test_idx': test_idx,
+        'scaler': scaler,
+        'frames': (X_train, X_test, y_train, y_test),
+    }
+
+def _get_split(data, target_col, test_size, random_state):
+    """Return the memoized split entry, computing it on a miss."""
+    key = (dataset_fingerprint(data), target_col, test_size, random_state)
+    with _split_lock:
+        entry = _split_cache.get(key)
+        if entry is not None:
+            _split_cache.move_to_end(key)
+            _split_stats['hits'] += 1
+            return entry
+
+    entry = _split_and_scale(data, target_col, test_size, random_state)
+    with _split_lock:
+        _split_stats['misses'] += 1
+        _split_cache[key] = entry
+        while len(_split_cache) > SPLIT_CACHE_SIZE:
+            _split_cache.popitem(last=False)
+    return entry
+
+def preprocess_data(data, target_col='avg_max_temp', test_size=TEST_SIZE, random_state=RANDOM_STATE):
+    """
+    Split data and scale numeric features.
+
+    Results are memoized on (dataset fingerprint, target_col, test_size,
+    random_state), so training and evaluation share the identical split and
+    fitted scaler. Returned frames are shallow views of the cached ones:
+    replace columns rather than writing into them in place.
+    """
+    entry = _get_split(data, target_col, test_size, random_state)
+    X_train, X_test, y_train, y_test = (f.copy(deep=False) for f in entry['frames'])
+    return X_train, X_test, y_train, y_test, entry['scaler']
+
+def _split_positions(n_rows, test_size, random_state):
+    """Return the (train, test) row positions shared by every split of `n_rows` rows."""
+    return train_test_split(np.arange(n_rows), test_size=test_size, random_state=random_state)
+
+def split_indices(data, target_col='avg_max_temp', test_size=TEST_SIZE, random_state=RANDOM_STATE):
+    """
+    Return the (train, test) row positions of the split.
+
+    Reuses a memoized split when there is one; otherwise only the positions
+    are computed (no scaler is fit), e.g. when evaluating with a stored scaler.
+    """
+    key = (dataset_fingerprint(data), target_col, test_size, random_state)
+    with _split_lock:
+        entry = _split_cache.get(key)
+    if entry is not None:
+        return entry['train_idx'], entry['test_idx']
+    return _split_positions(len(data), test_size, random_state)
+
+def split_cache_info():
+    """Return hit/miss counters and the current size of the split cache."""
+    with _split_lock:
+        return {**_split_stats, 'size': len(_split_cache), 'maxsize': SPLIT_CACHE_SIZE}
+
+def clear_split_cache():
+    """Drop all memoized splits and reset the counters."""
+    with _split_lock:
+        _split_cache.clear()
+        _split_stats.update(hits=0, misses=0)
 
-def save_model(model, model_name):
-    """Save a model to disk."""
-    model_dir = os.path.join(os.path.dirname(__file__), '..', 'models')
-    os.makedirs(model_dir, exist_ok=True)
-    joblib.dump(model, os.path.join(model_dir, f"{model_name}.pkl"))
+def save_model(model, model_name, **manifest):
+    """Save a model to disk as a new registry version."""
+    return register_model(model, model_name, **manifest)
 
 def load_model(model_name):
-    """Load a saved model."""
-    model_path = os.path.join(os.path.dirname(__file__), '..', 'models', f"{model_name}.pkl")
-    
-    if not os.path.exists(model_path):
-        raise FileNotFoundError(f"Model '{model_name}' not found.")
-    
-    return joblib.load(model_path)
+    """Load the latest saved version of a model."""
+    return registry_load_model(model_name)
@@ -0,0 +1,283 @@
+import math
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Scenario rasters described by data/raster_data/metadata.json, one GeoTIFF
+# per variable, scenario year and month: <variable>_<year>_<MM>.tif
+# (e.g. temperature_2020_01.tif), or <variable>_<year>.tif for annual layers.
+RASTER_DIR = Path(__file__).resolve().parent.parent / "data" / "raster_data"
+VARIABLES = ('temperature', 'precipitation')
+BASELINE_YEAR = 2020
+PROJECTION_YEAR = 2050
+TILE_SIZE = 256                   # used when a file is not internally tiled
+TILE_CACHE_BYTES = 128 * 1024 ** 2
+MASK_CACHE_SIZE = 8
+
+_datasets = {}
+_datasets_lock = threading.Lock()
+
+
+def raster_path(variable, year, month=None, raster_dir=RASTER_DIR):
+    """Return the path of a scenario raster under the naming convention."""
+    name = f"{variable}_{year}" if month is None else f"{variable}_{year}_{int(month):02d}"
+    return Path(raster_dir) / f"{name}.tif"
+
+
+def available_rasters(raster_dir=RASTER_DIR):
+    """Return (variable, year, month) for every scenario raster on disk; month is None for annual files."""
+    found = []
+    for path in sorted(Path(raster_dir).glob("*.tif")):
+        parts = path.stem.split("_")
+        if parts[0] in VARIABLES and len(parts) in (2, 3) and all(p.isdigit() for p in parts[1:]):
+            found.append((parts[0], int(parts[1]), int(parts[2]) if len(parts) == 3 else None))
+    return found
+
+
+class TileCache:
+    """
+    Bounded LRU of decoded raster tiles (float32 arrays with NaN for nodata),
+    keyed by (file, file version, decimation factor, tile row, tile col).
+    """
+
+    def __init__(self, max_bytes=TILE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            tile = self._entries.get(key)
+            if tile is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return tile
+
+    def put(self, key, tile):
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = tile
+                self._size += tile.nbytes
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.nbytes
+
+    def info(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'tiles': len(self._entries), 'bytes': self._size}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+_tile_cache = TileCache()
+
+
+class RasterLayer:
+    """
+    Tiled, windowed access to one single-band GeoTIFF.
+
+    Reads go through the file's internal tile grid (or TILE_SIZE blocks) and
+    decoded tiles are kept in the shared TileCache. A decimation `factor`
+    > 1 reads through the file's overviews (GDAL picks the matching one),
+    so coarse maps never decode full-resolution data.
+    """
+
+    def __init__(self, path):
+        import rasterio  # deferred: heavy, only needed once rasters are used
+
+        self.path = Path(path)
+        stat = self.path.stat()
+        self.version = (stat.st_size, stat.st_mtime_ns)
+        self._dataset = rasterio.open(self.path)
+        self._lock = threading.Lock()  # GDAL dataset handles are not thread-safe
+        ds = self._dataset
+        self.height, self.width = ds.height, ds.width
+        self.transform = ds.transform
+        self.crs = ds.crs
+        self.bounds = ds.bounds
+        self.nodata = ds.nodata
+        self.overviews = ds.overviews(1)
+        block_h, block_w = ds.block_shapes[0]
+        tiled = ds.profile.get('tiled', False) and block_h > 1 and block_w > 1
+        self.tile_shape = (block_h, block_w) if tiled else (TILE_SIZE, TILE_SIZE)
+
+    @property
+    def grid(self):
+        """Grid signature used to key rasterized region masks."""
+        return (self.height, self.width, tuple(self.transform), str(self.crs))
+
+    def factor_for(self, width_px):
+        """Return the coarsest available decimation that still gives `width_px` columns."""
+        wanted = max(1, self.width // max(1, width_px))
+        return max([1, *(f for f in self.overviews if f <= wanted)])
+
+    def tile_grid(self, factor=1):
+        """Return (tile rows, tile cols) at a decimation factor."""
+        h, w = math.ceil(self.height / factor), math.ceil(self.width / factor)
+        th, tw = self.tile_shape
+        return math.ceil(h / th), math.ceil(w / tw)
+
+    def read_tile(self, row, col, factor=1):
+        """Return one decoded tile (float32, NaN for nodata) at a decimation factor."""
+        key = (str(self.path), self.version, factor, row, col)
+        tile = _tile_cache.get(key)
+        if tile is not None:
+            return tile
+
+        from rasterio.enums import Resampling
+        from rasterio.windows import Window
+
+        th, tw = self.tile_shape
+        out_h = min(th, math.ceil(self.height / factor) - row * th)
+        out_w = min(tw, math.ceil(self.width / factor) - col * tw)
+        window = Window(col * tw * factor, row * th * factor,
+                        min(out_w * factor, self.width - col * tw * factor),
+                        min(out_h * factor, self.height - row * th * factor))
+        with self._lock:
+            data = self._dataset.read(1, window=window, out_shape=(out_h, out_w),
+                                      resampling=Resampling.average, masked=True)
+        tile = data.astype(np.float32).filled(np.nan)
+        tile.setflags(write=False)
+        _tile_cache.put(key, tile)
+        return tile
+
+    def iter_tiles(self, factor=1):
+        """Yield (row slice, col slice, tile) over the whole raster."""
+        th, tw = self.tile_shape
+        rows, cols = self.tile_grid(factor)
+        for r in range(rows):
+            for c in range(cols):
+                tile = self.read_tile(r, c, factor)
+                yield slice(r * th, r * th + tile.shape[0]), slice(c * tw, c * tw + tile.shape[1]), tile
+
+    def read(self, factor=1):
+        """Assemble the whole raster at a decimation factor from cached tiles."""
+        out = np.empty((math.ceil(self.height / factor), math.ceil(self.width / factor)), dtype=np.float32)
+        for rows, cols, tile in self.iter_tiles(factor):
+            out[rows, cols] = tile
+        return out
+
+
+def open_raster(path):
+    """Return the process-wide RasterLayer for `path`, reopening it when the file changes."""
+    path = Path(path)
+    stat = path.stat()
+    with _datasets_lock:
+        layer = _datasets.get(path)
+        if layer is not None and layer.version == (stat.st_size, stat.st_mtime_ns):
+            return layer
+        layer = RasterLayer(path)
+        _datasets[path] = layer
+        return layer
+
+
+_masks = OrderedDict()
+_masks_lock = threading.Lock()
+
+
+def geometry_digest(frame):
+    """Return a hash of a GeoDataFrame's geometries (in order) and CRS."""
+    import shapely
+
+    digest = hashlib.sha1(str(frame.crs).encode())
+    for wkb in shapely.to_wkb(frame.geometry.to_numpy()):
+        digest.update(wkb or b'')
+    return digest.hexdigest()
+
+
+def region_labels(regions, raster):
+    """
+    Rasterize `regions` (a geo_service GeoLayer) onto a raster's grid.
+
+    Returns an int32 array with the 1-based position of the region covering
+    each pixel centre (0 outside every region). Cached per (region
+    geometries, grid), so different layers or levels never share labels.
+    """
+    key = (geometry_digest(regions.frame), raster.grid)
+    with _masks_lock:
+        if key in _masks:
+            _masks.move_to_end(key)
+            return _masks[key]
+
+    from rasterio.features import rasterize
+
+    geometries = regions.frame.to_crs(raster.crs).geometry if raster.crs else regions.frame.geometry
+    labels = rasterize(
+        ((geom, i + 1) for i, geom in enumerate(geometries) if geom is not None and not geom.is_empty),
+        out_shape=(raster.height, raster.width), transform=raster.transform, fill=0, dtype='int32',
+    )
+    labels.setflags(write=False)
+    with _masks_lock:
+        _masks[key] = labels
+        while len(_masks) > MASK_CACHE_SIZE:
+            _masks.popitem(last=False)
+    return labels
+
+
+def zonal_stats(raster, regions, key_col=None):
+    """
+    Mean/min/max/count of a raster per region.
+
+    Runs tile by tile over the cached tiles: counts and sums with
+    `np.bincount`, extremes with `np.fmin.at`/`np.fmax.at` on the valid
+    pixels, so no per-region Python loop touches the pixels.
+    """
+    labels = region_labels(regions, raster)
+    n = len(regions.frame) + 1
+    count = np.zeros(n)
+    total = np.zeros(n)
+    low = np.full(n, np.inf)
+    high = np.full(n, -np.inf)
+    for rows, cols, tile in raster.iter_tiles():
+        tile_labels = labels[rows, cols].ravel()
+        values = tile.ravel()
+        valid = (tile_labels > 0) & ~np.isnan(values)
+        tile_labels, values = tile_labels[valid], values[valid]
+        count += np.bincount(tile_labels, minlength=n)
+        total += np.bincount(tile_labels, weights=values, minlength=n)
+        np.fmin.at(low, tile_labels, values)
+        np.fmax.at(high, tile_labels, values)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+    empty = count == 0
+    low[empty] = high[empty] = np.nan
+    index = regions.attributes[key_col] if key_col else regions.attributes.index
+    return pd.DataFrame(
+        {'mean': mean[1:], 'min': low[1:], 'max': high[1:], 'count': count[1:].astype(int)},
+        index=pd.Index(index, name=key_col),
+    )
+
+
+def compare_scenarios(variable, regions, month=None, key_col=None,
+                      baseline=BASELINE_YEAR, projection=PROJECTION_YEAR, raster_dir=RASTER_DIR):
+    """
+    Per-region baseline vs projection means and their difference.
+
+    Returns a DataFrame with `baseline`, `projection`, `change` and
+    `change_pct` columns, one row per region.
+    """
+    base = zonal_stats(open_raster(raster_path(variable, baseline, month, raster_dir)), regions, key_col)
+    proj = zonal_stats(open_raster(raster_path(variable, projection, month, raster_dir)), regions, key_col)
+    table = pd.DataFrame({'baseline': base['mean'], 'projection': proj['mean']})
+    table['change'] = table['projection'] - table['baseline']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        table['change_pct'] = 100 * table['change'] / table['baseline'].abs()
+    return table
+
+
+def tile_cache_info():
+    """Return hit/miss counters and the size of the shared tile cache."""
+    return _tile_cache.info()
@@ -0,0 +1,116 @@
+"""
+Score a CSV or JSONL file of climate text with the saved sentiment model.
+
+Input is read and results are written chunk by chunk, so memory use is
+bounded by the batch size regardless of the file size.
+
+    python -m utils.sentiment_cli feedback.csv scored.csv --text-column Feedback
+    python -m utils.sentiment_cli news.jsonl scored.jsonl --jobs 4
+"""
+import argparse
+import sys
+from collections import deque
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+
+from utils.climate_text_analysis import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_MODEL_FILENAME,
+    SENTIMENT_LABELS,
+    score_chunks,
+)
+
+
+def _file_format(path: str, override: str = None) -> str:
+    if override:
+        return override
+    suffix = Path(path).suffix.lower()
+    return "jsonl" if suffix in (".jsonl", ".ndjson", ".json") else "csv"
+
+
+def read_chunks(path: str, fmt: str, batch_size: int) -> Iterator[pd.DataFrame]:
+    """Yield the input file as DataFrames of at most `batch_size` rows."""
+    source = sys.stdin if path == "-" else path
+    if fmt == "jsonl":
+        yield from pd.read_json(source, lines=True, chunksize=batch_size)
+    else:
+        yield from pd.read_csv(source, chunksize=batch_size)
+
+
+def write_chunk(frame: pd.DataFrame, out, fmt: str, first: bool) -> None:
+    """Append one scored chunk to the open output stream."""
+    if fmt == "jsonl":
+        if not frame.empty:
+            text = frame.to_json(orient="records", lines=True, force_ascii=False)
+            out.write(text if text.endswith("\n") else text + "\n")
+    else:
+        frame.to_csv(out, index=False, header=first)
+    out.flush()
+
+
+def score_file(
+    input_path: str,
+    output_path: str,
+    text_column: str = "text",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    n_jobs: int = 1,
+    model_filename: str = DEFAULT_MODEL_FILENAME,
+    input_format: str = None,
+    output_format: str = None,
+) -> int:
+    """Score every row of `input_path` and write it to `output_path`. Returns the row count."""
+    in_fmt = _file_format(input_path, input_format)
+    out_fmt = _file_format(output_path, output_format)
+    frames = deque()
+
+    def texts():
+        for frame in read_chunks(input_path, in_fmt, batch_size):
+            if text_column not in frame.columns:
+                raise ValueError(f"Column '{text_column}' not found. Available columns: {frame.columns.tolist()}")
+            frames.append(frame)
+            yield frame[text_column].fillna("").astype(str).tolist()
+
+    rows = 0
+    out = sys.stdout if output_path == "-" else open(output_path, "w", encoding="utf-8", newline="")
+    try:
+        for i, scores in enumerate(score_chunks(texts(), model_filename, n_jobs)):
+            frame = frames.popleft().reset_index(drop=True)
+            scores["sentiment"] = scores["label"].map(SENTIMENT_LABELS)
+            write_chunk(pd.concat([frame, scores], axis=1), out, out_fmt, first=(i == 0))
+            rows += len(frame)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Batch sentiment scoring for climate text.")
+    parser.add_argument("input", help="Input CSV/JSONL file, or '-' for stdin")
+    parser.add_argument("output", help="Output CSV/JSONL file, or '-' for stdout")
+    parser.add_argument("--text-column", default="text", help="Column holding the text (default: text)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes (default: 1)")
+    parser.add_argument("--model", default=DEFAULT_MODEL_FILENAME, help="Model filename in the registry")
+    parser.add_argument("--input-format", choices=["csv", "jsonl"])
+    parser.add_argument("--output-format", choices=["csv", "jsonl"])
+    args = parser.parse_args(argv)
+
+    rows = score_file(
+        args.input,
+        args.output,
+        text_column=args.text_column,
+        batch_size=args.batch_size,
+        n_jobs=args.jobs,
+        model_filename=args.model,
+        input_format=args.input_format,
+        output_format=args.output_format,
+    )
+    print(f"Scored {rows} rows.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,3 @@
+# Sentiment label mapping, kept free of model imports so pages that only
+# display labels (e.g. the Dashboard) don't load the sklearn text stack
+SENTIMENT_LABELS = {1: "Positive", 0: "Negative"}
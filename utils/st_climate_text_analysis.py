@@ -1,17 +1,16 @@
 import streamlit as st
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from utils.climate_text_analysis import (
     load_sentiment_data,
     preprocess_data,
-    train_sentiment_model,
-    save_model,
-    load_model,
-    clean_text,
+    train_and_save_sentiment_model,
+    update_sentiment_model,
+    get_sentiment_predictor,
+    SENTIMENT_LABELS,
 )
-
-# Configurable sentiment label mapping at module level
-SENTIMENT_LABELS: Dict[int, str] = {1: "Positive", 0: "Negative"}
+from utils.job_queue import get_job_queue
+from utils.preprocess import dataset_fingerprint
 
 
 def display_classification_report(report: Dict[str, Any]):
@@ -43,6 +42,33 @@ def display_classification_report(report: Dict[str, Any]):
         st.json(report["weighted avg"])
 
 
+@st.fragment(run_every=1.0)
+def show_sentiment_job(job_id: str) -> None:
+    """Poll the sentiment training job until it finishes."""
+    info = get_job_queue().status(job_id)
+    if info is None or info["status"] not in ("pending", "running"):
+        st.rerun()  # stop polling: the result is rendered once, outside the fragment
+    st.progress(info["progress"], text=f"{info['description']}: {info['status']} {info['message']}")
+
+
+def show_sentiment_result(job_id: str, info: Optional[Dict[str, Any]]) -> None:
+    """Show a finished sentiment training job's report or error."""
+    if info is None:
+        return
+    if info["status"] == "done":
+        # Make sure predictions switch to the newly saved model right away
+        if st.session_state.get("sentiment_job_seen") != job_id:
+            get_sentiment_predictor().invalidate()
+            st.session_state.sentiment_job_seen = job_id
+        report = info["result"]["report"]
+        if report:
+            display_classification_report(report)
+    elif info["status"] == "failed":
+        st.error(f"Training failed: {info['error']}")
+    else:
+        st.warning("Training job was cancelled.")
+
+
 def run_climate_text_analysis() -> None:
     st.subheader("Climate Text Sentiment Analysis")
 
@@ -56,16 +82,57 @@ def run_climate_text_analysis() -> None:
         st.success("Data loaded and preprocessed successfully.")
         st.dataframe(df_processed.head())
 
+    training_mode = st.radio(
+        "Training Mode",
+        ["TF-IDF (batch)", "Hashing (online)"],
+        horizontal=True,
+        help="Online mode streams the CSVs in chunks and produces a fixed-size model that can be updated with new labelled text.",
+    )
+
+    # Training runs in the background job queue; the page polls for the result
     if st.button("Train Sentiment Model"):
-        df_train: pd.DataFrame = st.session_state.get("preprocessed_df")
-        if df_train is not None:
-            model, report, _ = train_sentiment_model(
-                df_train
-            )  # accuracy is part of report
-            save_model(model)
-            display_classification_report(report)
+        if training_mode == "Hashing (online)":
+            st.session_state.sentiment_job_id = get_job_queue().submit(
+                train_and_save_sentiment_model, mode="online",
+                key=("sentiment", "online"), description="Online sentiment model",
+            )
+        else:
+            df_train: pd.DataFrame = st.session_state.get("preprocessed_df")
+            if df_train is not None:
+                st.session_state.sentiment_job_id = get_job_queue().submit(
+                    train_and_save_sentiment_model, df_train, mode="batch",
+                    key=("sentiment", "batch", dataset_fingerprint(df_train)), description="TF-IDF sentiment model",
+                )
+            else:
+                st.warning("Please load and preprocess the data first.")
+
+    job_id = st.session_state.get("sentiment_job_id")
+    if job_id is not None:
+        info = get_job_queue().status(job_id)
+        if info is not None and info["status"] in ("pending", "running"):
+            show_sentiment_job(job_id)
         else:
-            st.warning("Please load and preprocess the data first.")
+            show_sentiment_result(job_id, info)
+
+    if training_mode == "Hashing (online)":
+        with st.expander("Update the online model with labelled text"):
+            new_texts = st.text_area("One statement per line:", key="online_update_texts")
+            new_label = st.selectbox(
+                "Label for these statements",
+                list(SENTIMENT_LABELS),
+                format_func=SENTIMENT_LABELS.get,
+            )
+            if st.button("Update Model"):
+                lines = [line for line in new_texts.splitlines() if line.strip()]
+                if lines:
+                    try:
+                        manifest = update_sentiment_model(lines, [new_label] * len(lines))
+                        get_sentiment_predictor().invalidate()
+                        st.success(f"Model updated with {len(lines)} statements (version {manifest['version']}).")
+                    except (FileNotFoundError, ValueError) as e:
+                        st.error(str(e))
+                else:
+                    st.warning("Please enter at least one statement.")
 
     st.markdown("---")
     st.subheader("Test the Sentiment Model")
@@ -74,9 +141,7 @@ def run_climate_text_analysis() -> None:
     if st.button("Predict Sentiment"):
         if user_input:
             try:
-                model = load_model()
-                cleaned_input = clean_text(user_input)
-                prediction = model.predict([cleaned_input])[0]
+                prediction = get_sentiment_predictor().predict([user_input])[0]
                 sentiment: str = SENTIMENT_LABELS.get(
                     prediction, f"Unknown ({prediction})"
                 )
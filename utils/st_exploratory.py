@@ -1,17 +1,68 @@
 import streamlit as st
+import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 from utils.exploratory import (
     get_basic_stats,
     get_correlation,
-    get_time_series,
-    get_distribution_data,
+    get_time_series_lod,
+    get_histogram,
 )
+from utils.figure_cache import render_cached
+from utils.preprocess import dataset_fingerprint
+
+
+def draw_correlation_heatmap(df, fingerprint):
+    corr = get_correlation(df, fingerprint)
+    fig, ax = plt.subplots(figsize=(10, 6))
+    sns.heatmap(corr, annot=True, cmap="coolwarm", ax=ax)
+    return fig
+
+
+def draw_time_series(df, fingerprint, date_col, target_col, date_range=None):
+    # Ask for about one point per horizontal pixel of the figure
+    figsize, dpi = (10, 5), 100
+    level_name, ts_df = get_time_series_lod(
+        df, date_col, target_col, date_range=date_range, width_px=figsize[0] * dpi, fingerprint=fingerprint
+    )
+    fig, ax = plt.subplots(figsize=figsize)
+    sns.lineplot(data=ts_df, x=date_col, y=target_col, ax=ax)
+    if (ts_df["count"] > 1).any():
+        ax.fill_between(ts_df[date_col], ts_df["min"], ts_df["max"], alpha=0.2, label="min-max")
+        ax.legend()
+    ax.set_title(f"{target_col} over {date_col} ({level_name} level)")
+    return fig
+
+
+def draw_distribution(df, fingerprint, column):
+    counts, edges = get_histogram(df, column, fingerprint)
+    binned = pd.DataFrame({column: (edges[:-1] + edges[1:]) / 2, "count": counts})
+    fig, ax = plt.subplots()
+    sns.histplot(
+        data=binned, x=column, weights="count",
+        bins=len(counts), binrange=(edges[0], edges[-1]), kde=True, ax=ax,
+    )
+    return fig
 
 
 def run_eda(df):
     st.subheader("Exploratory Data Analysis")
 
+    # The data is hashed at most once per rerun; the fingerprint keys the
+    # statistics and the rendered plots, which are cached across sessions
+    fingerprint = None
+
+    def data_fingerprint():
+        nonlocal fingerprint
+        if fingerprint is None:
+            fingerprint = dataset_fingerprint(df)
+        return fingerprint
+
+    def show_plot(kind, draw, *params):
+        key = (data_fingerprint(), kind) + params
+        png = render_cached(key, lambda: draw(df, data_fingerprint(), *params))
+        st.image(png, use_container_width=True)
+
     # Show raw data
     if st.checkbox("Raw Data"):
         with st.container(border=True):
@@ -19,7 +70,7 @@ def run_eda(df):
 
     # Show basic stats
     if st.checkbox("Basic Statistics"):
-        stats, missing = get_basic_stats(df)
+        stats, missing = get_basic_stats(df, data_fingerprint())
         st.write("Summary Statistics:")
         st.dataframe(stats)
         st.write("Missing Values:")
@@ -28,10 +79,7 @@ def run_eda(df):
     # Show correlation heatmap
     if st.checkbox("Correlation Heatmap"):
         with st.container(border=True):
-            corr = get_correlation(df)
-            fig, ax = plt.subplots(figsize=(10, 6))
-            sns.heatmap(corr, annot=True, cmap="coolwarm", ax=ax)
-            st.pyplot(fig)
+            show_plot("correlation_heatmap", draw_correlation_heatmap)
 
     # Time Series Analysis
     if st.checkbox("Time Series Analysis"):
@@ -41,14 +89,15 @@ def run_eda(df):
             df.select_dtypes(include="number").columns,
             index=None,
         )
+        date_range = None
+        if date_col is not None and pd.api.types.is_numeric_dtype(df[date_col]) and df[date_col].notna().any():
+            low, high = df[date_col].min().item(), df[date_col].max().item()
+            if low < high:
+                date_range = st.slider("Select Range", low, high, (low, high))
         TSA = st.button("GO", type="primary")
         if TSA == True:
             try:
-                ts_df = get_time_series(df, date_col, target_col)
-                fig, ax = plt.subplots(figsize=(10, 5))
-                sns.lineplot(data=ts_df, x=date_col, y=target_col, ax=ax)
-                ax.set_title(f"{target_col} over {date_col}")
-                st.pyplot(fig)
+                show_plot("time_series", draw_time_series, date_col, target_col, date_range)
             except Exception as e:
                 st.error(f"Could not generate time series plot: {e}")
 
@@ -57,7 +106,4 @@ def run_eda(df):
         column = st.selectbox(
             "Select Column for Distribution", df.select_dtypes(include="number").columns
         )
-        data = get_distribution_data(df, column)
-        fig, ax = plt.subplots()
-        sns.histplot(data, kde=True, ax=ax)
-        st.pyplot(fig)
+        show_plot("distribution", draw_distribution, column)
@@ -8,19 +8,31 @@ from utils.feature_engineering import (
     bin_numerical_variable,
     apply_transformation
 )
+from utils.dataset_manager import get_dataset_manager, get_session_id
 
 def run_feature_engineering(df):
     st.subheader("Feature Engineering")
 
+    # Every applied step extends the transformation chain. Each prefix of the
+    # chain is cached by the dataset manager, so reruns reuse earlier results.
+    manager = get_dataset_manager()
+    session_id = get_session_id()
+    chain = ()
+
+    def apply_step(func, *args):
+        nonlocal df, chain
+        chain = chain + ((func.__name__,) + args,)
+        df = manager.derive(session_id, chain, lambda frame: func(frame, *args), parent=df)
+
     # Handle missing values
     if st.checkbox("Handle Missing Values"):
         strategy = st.selectbox("Imputation Strategy", ['mean', 'median', 'most_frequent'])
-        df = handle_missing_values(df, strategy)
+        apply_step(handle_missing_values, strategy)
         st.success(f"Missing values handled using {strategy} strategy.")
 
     # Encode categorical variables
     if st.checkbox("Encode Categorical Variables"):
-        df = encode_categorical(df)
+        apply_step(encode_categorical)
         st.success("Categorical variables encoded.")
 
     # # Extract date features
@@ -33,22 +45,31 @@ def run_feature_engineering(df):
     if st.checkbox("Create New Feature"):
         col1 = st.selectbox("Select First Column", df.columns)
         col2 = st.selectbox("Select Second Column", df.columns)
-        df = create_new_feature(df, col1, col2)
+        apply_step(create_new_feature, col1, col2)
         st.success(f"Interaction term between {col1} and {col2} created.")
 
     # Bin numerical variable
     if st.checkbox("Bin Numerical Variable"):
         column = st.selectbox("Select Column to Bin", df.select_dtypes(include='number').columns)
         bins = st.slider("Number of Bins", min_value=2, max_value=10, value=5)
-        df = bin_numerical_variable(df, column, bins)
+        apply_step(bin_numerical_variable, column, bins)
         st.success(f"{column} binned into {bins} intervals.")
 
     # Apply transformation
     if st.checkbox("Apply Transformation"):
         column = st.selectbox("Select Column to Transform", df.select_dtypes(include='number').columns)
         transformation = st.selectbox("Select Transformation", ['log', 'sqrt'])
-        df = apply_transformation(df, column, transformation)
+        apply_step(apply_transformation, column, transformation)
         st.success(f"{transformation} transformation applied to {column}.")
 
+    # Other pages of this session pick up the engineered frame
+    manager.set_active(session_id, chain)
+
+    if chain:
+        # Training saves this chain as a fitted pipeline next to the model
+        with st.expander("Recorded Pipeline"):
+            st.write([f"{name}({', '.join(map(repr, args))})" for name, *args in chain])
+
     st.subheader("Transformed Data")
     st.dataframe(df)
+    return df
@@ -1,6 +1,14 @@
 import streamlit as st
-from utils.model_evaluation import load_model, evaluate_predictions, plot_actual_vs_predicted
-from utils.preprocess import preprocess_data
+from utils.model_evaluation import (
+    load_model_with_manifest,
+    apply_feature_pipeline,
+    prepare_test_data,
+    evaluate_predictions,
+    plot_actual_vs_predicted,
+)
+from utils.model_registry import list_versions
+from utils.preprocess import dataset_fingerprint
+from utils.dataset_manager import get_dataset_manager
 
 def run_model_evaluation(df):
     st.subheader("📊 Model Evaluation")
@@ -8,12 +16,22 @@ def run_model_evaluation(df):
     target_col = st.selectbox("Select Target Column", df.columns)
 
     model_name = st.selectbox("Select Trained Model", ["linear_regression", "random_forest"])
-
-    # Preprocess data
-    X_train, X_test, y_train, y_test, _ = preprocess_data(df, target_col)
+    versions = list_versions(model_name)
+    version = st.selectbox("Select Version", versions[::-1], index=0) if versions else None
 
     try:
-        model = load_model(model_name)
+        model, manifest = load_model_with_manifest(model_name, version)
+
+        # Replay the model's feature pipeline on the raw data if it has one
+        engineered = apply_feature_pipeline(get_dataset_manager().base, manifest)
+        if engineered is not None:
+            df = engineered
+
+        # Rebuild the training split with the scaler stored alongside the model
+        X_test, y_test = prepare_test_data(df, manifest, target_col)
+        if manifest.get('data_fingerprint') not in (None, dataset_fingerprint(df)):
+            st.warning("This model was trained on a different version of the data.")
+
         predictions, metrics = evaluate_predictions(model, X_test, y_test)
 
         st.write("### Evaluation Metrics")
@@ -23,5 +41,5 @@ def run_model_evaluation(df):
         fig = plot_actual_vs_predicted(y_test, predictions)
         st.pyplot(fig)
 
-    except FileNotFoundError as e:
+    except (FileNotFoundError, ValueError) as e:
         st.error(str(e))
@@ -1,6 +1,11 @@
+import os
 import streamlit as st
-from utils.model_training import train_model, evaluate_model, save_model
-from utils.preprocess import preprocess_data
+from utils.model_search import SearchJob, SEARCH_STRATEGIES, PARAM_GRIDS
+from utils.job_queue import get_job_queue
+from utils.model_training import train_and_save
+from utils.preprocess import dataset_fingerprint
+from utils.dataset_manager import get_dataset_manager, get_session_id
+from utils.feature_engineering import get_fitted_pipeline
 
 def run_model_training(df):
     st.subheader("Model Training")
@@ -8,8 +13,10 @@ def run_model_training(df):
     # Select target variable
     target_col = st.selectbox("Select Target Variable", df.columns)
 
-    # Split and preprocess data
-    X_train, X_test, y_train, y_test, scaler = preprocess_data(df, target_col=target_col)
+    mode = st.radio("Training Mode", ["Single Model", "Hyperparameter Search"], horizontal=True)
+    if mode == "Hyperparameter Search":
+        run_hyperparameter_search(df, target_col)
+        return
 
     # Select model type
     model_type = st.selectbox("Select Model Type", ['Linear Regression', 'Random Forest'])
@@ -22,21 +29,101 @@ def run_model_training(df):
         params['n_estimators'] = n_estimators
         params['max_depth'] = max_depth
 
-    # Train model
+    # Train model in the background job queue so the session never blocks on fit
     if st.button("Train Model"):
-        model = train_model(X_train, y_train, model_type=model_type, **params)
-        metrics = evaluate_model(model, X_test, y_test)
+        key = ('regression', dataset_fingerprint(df), target_col, model_type, tuple(sorted(params.items())))
+        st.session_state.training_job_id = get_job_queue().submit(
+            train_and_save, df, target_col, model_type, params, current_pipeline(),
+            key=key, description=f"{model_type} on {target_col}",
+        )
+
+    job_id = st.session_state.get("training_job_id")
+    if job_id is None:
+        return
+    info = get_job_queue().status(job_id)
+    if info is not None and info['status'] in ('pending', 'running'):
+        show_training_job(job_id)
+    else:
+        show_training_result(info)
+
+
+@st.fragment(run_every=1.0)
+def show_training_job(job_id):
+    """Poll the training job until it finishes."""
+    info = get_job_queue().status(job_id)
+    if info is None or info['status'] not in ('pending', 'running'):
+        st.rerun()  # stop polling: the result is rendered once, outside the fragment
+    st.progress(info['progress'], text=f"{info['description']}: {info['status']} {info['message']}")
+
+
+def show_training_result(info):
+    """Show a finished training job's metrics or error."""
+    if info is None:
+        return
+    if info['status'] == 'done':
+        result = info['result']
         st.write("Model Evaluation Metrics:")
-        st.write(metrics)
-
-        # Predict
-        # y_pred = model.predict(X_test)
-
-        # Save model
-        save_model(model, model_name=model_type.replace(" ", "_").lower())
-        # st.session_state.trained_model = model
-        # st.session_state.model_name = model_type
-        # st.session_state.X_test = X_test
-        # st.session_state.y_test = y_test
-        # st.session_state.y_pred = y_pred
-        st.success(f"{model_type} model trained and saved successfully.")
+        st.write(result['metrics'])
+        manifest = result['manifest']
+        st.success(f"{info['description']} trained and saved as version {manifest['version']}.")
+    elif info['status'] == 'failed':
+        st.error(f"Training failed: {info['error']}")
+    else:
+        st.warning("Training job was cancelled.")
+
+
+def run_hyperparameter_search(df, target_col):
+    """Start, monitor and cancel a background hyperparameter search."""
+    model_types = st.multiselect("Model Types", list(PARAM_GRIDS), default=list(PARAM_GRIDS))
+    strategy = st.selectbox("Search Strategy", SEARCH_STRATEGIES)
+    max_workers = max(2, os.cpu_count() or 1)
+    n_jobs = st.slider("Parallel Workers", 1, max_workers, 2)
+
+    job = st.session_state.get("search_job")
+    running = job is not None and not job.done
+
+    col_start, col_cancel = st.columns(2)
+    if col_start.button("Start Search", disabled=running or not model_types):
+        job = SearchJob(df, target_col, model_types, strategy=strategy, n_jobs=n_jobs,
+                        pipeline=current_pipeline()).start()
+        st.session_state.search_job = job
+    if col_cancel.button("Cancel Search", disabled=not running):
+        job.cancel()
+
+    if job is None:
+        return
+    if job.done:
+        show_search_result(job)
+    else:
+        show_search_progress(job)
+
+
+@st.fragment(run_every=1.0)
+def show_search_progress(job):
+    """Re-render the leaderboard every second while the search runs."""
+    if job.done:
+        st.rerun()  # stop polling: the finished search is rendered once, outside the fragment
+    show_search_result(job)
+
+
+def show_search_result(job):
+    """Show the search status, leaderboard and, once finished, the best model."""
+    st.write(f"Search status: **{job.status}** ({len(job.results)} folds scored)")
+    st.dataframe(job.leaderboard())
+    if job.status == "done":
+        st.success(
+            f"Best: {job.best['model_type']} {job.best['params']} "
+            f"saved as version {job.manifest['version']}."
+        )
+        st.write(job.best['metrics'])
+    elif job.status == "failed":
+        st.error(f"Search failed: {job.error}")
+
+
+def current_pipeline():
+    """Return this session's feature engineering chain as a serialized, fitted pipeline."""
+    manager = get_dataset_manager()
+    chain = manager.active_chain(get_session_id())
+    if not chain:
+        return None
+    return get_fitted_pipeline(manager.base, chain).to_dict()
@@ -0,0 +1,86 @@
+import pandas as pd
+import streamlit as st
+from utils.prediction import (
+    FORECAST_MODELS,
+    DEFAULT_TARGET,
+    DEFAULT_HORIZON,
+    YEAR_COL,
+    HOLD,
+    TREND,
+    TREND_WINDOW,
+    make_scenario,
+    model_target,
+    get_forecast,
+)
+from utils.model_registry import list_versions
+
+DEFAULT_COVARIATES = ['fertilizer_kg_per_ha', 'population_density', 'relative_humidity']
+# Annual % change per covariate for the starting scenarios
+DEFAULT_SCENARIOS = {
+    "Baseline": {},
+    "High fertilizer": {'fertilizer_kg_per_ha': 3.0},
+    "Dense population": {'population_density': 2.0},
+    "Humid": {'relative_humidity': 0.5},
+}
+
+
+def scenarios_from_table(table, default):
+    """Turn the edited scenario table (one row per scenario) into scenario specs."""
+    scenarios = []
+    for _, row in table.iterrows():
+        name = row.pop('Scenario')
+        if not isinstance(name, str) or not name.strip():
+            continue
+        changes = {col: float(value) for col, value in row.items() if pd.notna(value)}
+        scenarios.append(make_scenario(name.strip(), changes, default))
+    return scenarios
+
+
+def run_prediction(df):
+    st.subheader("🔮 Prediction")
+
+    model_name = st.selectbox("Select Trained Model", FORECAST_MODELS)
+    versions = list_versions(model_name)
+    version = st.selectbox("Select Version", versions[::-1], index=0) if versions else None
+
+    try:
+        target = model_target(model_name, version, df.columns)
+        if target is None:
+            # The model's target can't be told from its features
+            numeric = list(df.select_dtypes(include='number').columns)
+            target = st.selectbox("Target the model predicts", numeric,
+                                  index=numeric.index(DEFAULT_TARGET) if DEFAULT_TARGET in numeric else 0)
+
+        last_year = int(df[YEAR_COL].max())
+        horizon = st.slider("Forecast up to", last_year + 1, 2100, max(last_year + 1, DEFAULT_HORIZON))
+
+        covariate_options = [c for c in df.select_dtypes(include='number').columns if c not in (YEAR_COL, target)]
+        covariates = st.multiselect(
+            "Scenario covariates", covariate_options,
+            default=[c for c in DEFAULT_COVARIATES if c in covariate_options],
+        )
+        other = st.radio(
+            "Other covariates", [HOLD, TREND], horizontal=True,
+            format_func={HOLD: "Hold at last value", TREND: f"Follow {TREND_WINDOW}-year trend"}.get,
+        )
+
+        st.caption("Annual % change per covariate; leave a cell empty to treat it like the other covariates.")
+        table = pd.DataFrame([{'Scenario': name, **changes} for name, changes in DEFAULT_SCENARIOS.items()])
+        table = table.reindex(columns=['Scenario', *covariates])
+        table = st.data_editor(table, num_rows="dynamic", hide_index=True,
+                               key=f"scenarios_{'_'.join(covariates)}")
+        scenarios = scenarios_from_table(table, other)
+        if not scenarios:
+            st.info("Add at least one scenario.")
+            return
+
+        result = get_forecast(df, scenarios, horizon, model_name, version, target)
+
+        st.write(f"### Projected {target}")
+        chart = result.pivot(index=YEAR_COL, columns='scenario', values='prediction')
+        observed = df.set_index(YEAR_COL)[target].rename("Observed")
+        st.line_chart(pd.concat([observed, chart], axis=1))
+        st.dataframe(chart)
+
+    except (FileNotFoundError, ValueError) as e:
+        st.error(str(e))
@@ -0,0 +1,207 @@
+import copy
+import hashlib
+import threading
+import warnings
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+DEFAULT_BINS = 30
+STATS_CACHE_SIZE = 8
+DESCRIBE_INDEX = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+
+_stats_cache = OrderedDict()
+_stats_lock = threading.Lock()
+
+
+def _row_hashes(df):
+    return pd.util.hash_pandas_object(df, index=True).to_numpy()
+
+
+def _fingerprint(row_hashes, df):
+    digest = hashlib.sha1(row_hashes.tobytes())
+    digest.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode())
+    return digest.hexdigest()
+
+
+class DatasetStats:
+    """
+    Summary statistics of the numeric block of a DataFrame.
+
+    Everything except the quantiles is kept as running sums, so appended rows
+    can be folded in with `update()` without revisiting earlier rows. Sums
+    are taken over values shifted by the first batch's column means, which
+    keeps the single-pass variance and correlation numerically stable.
+    Correlations use pairwise-complete observations, like `DataFrame.corr`.
+    """
+
+    def __init__(self, df, bins=DEFAULT_BINS):
+        numeric = df.select_dtypes(include='number')
+        self.columns = list(numeric.columns)
+        self.other_columns = [c for c in df.columns if c not in numeric.columns]
+        self.all_columns = list(df.columns)
+        self.bins = bins
+
+        X = numeric.to_numpy(dtype=float)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN columns
+            shift = np.nanmean(X, axis=0) if len(X) else np.zeros(len(self.columns))
+        self.shift = np.nan_to_num(shift)
+
+        k = len(self.columns)
+        self.n_rows = 0
+        self.row_hashes = np.empty(0, dtype=np.uint64)
+        self.count = np.zeros(k)
+        self.sum = np.zeros(k)
+        self.sumsq = np.zeros(k)
+        self.min = np.full(k, np.nan)
+        self.max = np.full(k, np.nan)
+        self.other_missing = np.zeros(len(self.other_columns))
+        # Pairwise sums over rows where both columns i and j are present
+        self.pair_n = np.zeros((k, k))
+        self.pair_sum = np.zeros((k, k))    # sum of x_i
+        self.pair_sumsq = np.zeros((k, k))  # sum of x_i ** 2
+        self.pair_prod = np.zeros((k, k))   # sum of x_i * x_j
+        self.quantiles = np.full((3, k), np.nan)
+
+        self._fold(df, X)
+        self._refresh_full(X)
+        self.histograms = {c: self._histogram(i, X[:, i]) for i, c in enumerate(self.columns)}
+
+    def _fold(self, df, X):
+        """Add rows (numeric block `X`) to the running sums."""
+        mask = ~np.isnan(X)
+        Xs = np.where(mask, X - self.shift, 0.0)
+        M = mask.astype(float)
+
+        self.n_rows += len(X)
+        self.count += M.sum(axis=0)
+        self.sum += Xs.sum(axis=0)
+        self.sumsq += (Xs ** 2).sum(axis=0)
+        if len(X):
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN columns
+                self.min = np.fmin(self.min, np.nanmin(X, axis=0))
+                self.max = np.fmax(self.max, np.nanmax(X, axis=0))
+        if self.other_columns:
+            self.other_missing += df[self.other_columns].isnull().sum().to_numpy()
+
+        self.pair_n += M.T @ M
+        self.pair_sum += Xs.T @ M
+        self.pair_sumsq += (Xs ** 2).T @ M
+        self.pair_prod += Xs.T @ Xs
+
+    def _refresh_full(self, X):
+        """Recompute the statistics that need the whole column (quantiles)."""
+        if len(X):
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN columns
+                self.quantiles = np.nanpercentile(X, [25, 50, 75], axis=0)
+
+    def _histogram(self, col_idx, values):
+        lo, hi = self.min[col_idx], self.max[col_idx]
+        if np.isnan(lo):
+            return np.zeros(self.bins), np.linspace(0, 1, self.bins + 1)
+        if lo == hi:
+            lo, hi = lo - 0.5, hi + 0.5
+        return np.histogram(values[~np.isnan(values)], bins=self.bins, range=(lo, hi))
+
+    def update(self, df_new, X_full):
+        """
+        Fold appended rows into the sums and refresh quantiles and histograms.
+
+        `X_full` is the numeric block of the full (old + new) frame; it is only
+        used for the O(n) quantile/histogram refresh, never for the O(n k^2)
+        correlation sums.
+        """
+        X_new = df_new[self.columns].to_numpy(dtype=float)
+        old_min, old_max = self.min.copy(), self.max.copy()
+        self._fold(df_new, X_new)
+        self._refresh_full(X_full)
+
+        for i, column in enumerate(self.columns):
+            counts, edges = self.histograms[column]
+            if self.min[i] == old_min[i] and self.max[i] == old_max[i]:
+                values = X_new[:, i]
+                added, _ = np.histogram(values[~np.isnan(values)], bins=edges)
+                self.histograms[column] = (counts + added, edges)
+            else:
+                # New extremes move the bin edges: rebuild from the full column
+                self.histograms[column] = self._histogram(i, X_full[:, i])
+
+    def describe(self):
+        """Return the same summary as `DataFrame.describe()` for numeric columns."""
+        n = self.count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = self.shift + self.sum / n
+            var = (self.sumsq - self.sum ** 2 / n) / (n - 1)
+        std = np.sqrt(np.clip(var, 0, None))
+        std[n < 2] = np.nan
+        mean[n == 0] = np.nan
+        data = np.vstack([n, mean, std, self.min, *self.quantiles, self.max])
+        return pd.DataFrame(data, index=DESCRIBE_INDEX, columns=self.columns)
+
+    def missing(self):
+        """Return missing-value counts for every column, like `df.isnull().sum()`."""
+        counts = dict(zip(self.columns, (self.n_rows - self.count).astype(int)))
+        counts.update(zip(self.other_columns, self.other_missing.astype(int)))
+        return pd.Series([counts[c] for c in self.all_columns], index=self.all_columns, dtype='int64')
+
+    def corr(self):
+        """Return the Pearson correlation matrix of the numeric columns."""
+        n, s = self.pair_n, self.pair_sum
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = n * self.pair_prod - s * s.T
+            var = n * self.pair_sumsq - s ** 2
+            corr = cov / np.sqrt(var * var.T)
+        corr[n < 2] = np.nan
+        corr = np.clip(corr, -1.0, 1.0)
+        diag = np.diag(var) > 0
+        corr[np.diag_indices_from(corr)] = np.where(diag, 1.0, np.nan)
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+    def histogram(self, column):
+        """Return `(counts, edges)` for a numeric column."""
+        return self.histograms[column]
+
+
+def get_stats(df, bins=DEFAULT_BINS, fingerprint=None):
+    """
+    Return the statistics of `df`, cached by dataset fingerprint.
+
+    Pass the frame's `dataset_fingerprint` when the caller already has it, so
+    a cache hit doesn't hash the frame again. If `df` extends a cached frame
+    with appended rows (same columns, identical leading rows), the cached
+    statistics are copied and the new rows folded in.
+    """
+    row_hashes = None
+    if fingerprint is None:
+        row_hashes = _row_hashes(df)
+        fingerprint = _fingerprint(row_hashes, df)
+    key = (fingerprint, bins)
+    with _stats_lock:
+        if key in _stats_cache:
+            _stats_cache.move_to_end(key)
+            return _stats_cache[key]
+        candidates = [stats for stats in reversed(_stats_cache.values())
+                      if stats.bins == bins and stats.all_columns == list(df.columns)
+                      and 0 < stats.n_rows < len(df)]
+
+    if row_hashes is None:
+        row_hashes = _row_hashes(df)
+    base = next((stats for stats in candidates
+                 if np.array_equal(stats.row_hashes, row_hashes[:stats.n_rows])), None)
+
+    if base is not None:
+        stats = copy.deepcopy(base)
+        X_full = df[stats.columns].to_numpy(dtype=float)
+        stats.update(df.iloc[base.n_rows:], X_full)
+    else:
+        stats = DatasetStats(df, bins=bins)
+    stats.row_hashes = row_hashes
+
+    with _stats_lock:
+        _stats_cache[key] = stats
+        while len(_stats_cache) > STATS_CACHE_SIZE:
+            _stats_cache.popitem(last=False)
+    return stats
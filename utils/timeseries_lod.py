@@ -0,0 +1,156 @@
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+# Bucket levels from finest to coarsest for datetime series
+DATETIME_LEVELS = [('hour', 'h'), ('day', 'D'), ('month', 'M'), ('year', 'Y')]
+DATETIME_BUCKETS = {
+    'D': lambda b: b.dt.floor('D'),
+    'M': lambda b: b.dt.to_period('M').dt.start_time,
+    'Y': lambda b: b.dt.to_period('Y').dt.start_time,
+}
+DEFAULT_WIDTH_PX = 1000
+PYRAMID_CACHE_SIZE = 16
+
+_pyramid_cache = OrderedDict()
+_pyramid_lock = threading.Lock()
+
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Returns the indices of `n_out` points that preserve the visual shape of
+    the series (peaks and troughs) far better than striding or averaging.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # Bucket boundaries for the n - 2 interior points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    indices = np.empty(n_out, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point)
+        if i + 2 < len(edges):
+            nxt = slice(edges[i + 1], edges[i + 2])
+            avg_x, avg_y = x[nxt].mean(), y[nxt].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        bx, by = x[start:end], y[start:end]
+        area = np.abs((x[prev] - avg_x) * (by - y[prev]) - (x[prev] - bx) * (avg_y - y[prev]))
+        prev = start + int(np.argmax(area))
+        indices[i + 1] = prev
+    return indices
+
+
+def _aggregate(keys, values):
+    """Bucket raw values by `keys` into mean/min/max/count."""
+    level = values.groupby(keys.to_numpy(), sort=True).agg(['mean', 'min', 'max', 'count'])
+    return level.rename_axis('bucket').reset_index()
+
+
+def _coarsen(level, keys):
+    """Merge the buckets of a finer level into coarser buckets given by `keys`."""
+    weighted = level.assign(total=level['mean'] * level['count'], bucket=keys.to_numpy())
+    coarse = weighted.groupby('bucket', sort=True).agg(
+        total=('total', 'sum'), min=('min', 'min'), max=('max', 'max'), count=('count', 'sum')
+    )
+    coarse.insert(0, 'mean', coarse.pop('total') / coarse['count'])
+    return coarse.reset_index()
+
+
+def build_pyramid(df, date_col, target_col):
+    """
+    Pre-aggregate a series into levels of increasing bucket size.
+
+    Each level is a frame of `bucket, mean, min, max, count` sorted by
+    bucket. The finest level aggregates the raw rows once; every coarser
+    level is built from the one below it, so only the first level is O(rows).
+    Datetime columns get hour/day/month/year levels, numeric columns (e.g.
+    `year`) get one level per distinct value followed by power-of-two bins.
+    """
+    ts = df[[date_col, target_col]].dropna()
+    values = ts[target_col]
+    dates = ts[date_col]
+
+    if np.issubdtype(dates.dtype, np.datetime64):
+        level = _aggregate(dates.dt.floor('h'), values)
+        levels = [('hour', level)]
+        for name, freq in DATETIME_LEVELS[1:]:
+            level = _coarsen(level, DATETIME_BUCKETS[freq](level['bucket']))
+            levels.append((name, level))
+        return levels
+
+    level = _aggregate(dates, values)
+    levels = [('raw', level)]
+    if not np.issubdtype(dates.dtype, np.number) or len(level) < 2:
+        return levels
+
+    step = np.diff(level['bucket'].to_numpy(dtype=float)).min()
+    size = 2
+    while len(level) > 2:
+        width = step * size
+        level = _coarsen(level, np.floor(level['bucket'] / width) * width)
+        levels.append((f'x{size}', level))
+        size *= 2
+    return levels
+
+
+def get_pyramid(df, date_col, target_col, fingerprint=None):
+    """
+    Return the cached pyramid for a series, building it on first use.
+
+    Pass the frame's `dataset_fingerprint` to key the cache on it; otherwise
+    the two columns are hashed on every call.
+    """
+    if fingerprint is None:
+        hashes = pd.util.hash_pandas_object(df[[date_col, target_col]], index=False).to_numpy()
+        fingerprint = hashlib.sha1(hashes.tobytes()).hexdigest()
+    key = (fingerprint, date_col, target_col)
+    with _pyramid_lock:
+        if key in _pyramid_cache:
+            _pyramid_cache.move_to_end(key)
+            return _pyramid_cache[key]
+    pyramid = build_pyramid(df, date_col, target_col)
+    with _pyramid_lock:
+        _pyramid_cache[key] = pyramid
+        while len(_pyramid_cache) > PYRAMID_CACHE_SIZE:
+            _pyramid_cache.popitem(last=False)
+    return pyramid
+
+
+def select_level(pyramid, date_range=None, width_px=DEFAULT_WIDTH_PX):
+    """
+    Pick the finest level with at most `width_px` buckets inside `date_range`,
+    then downsample it with LTTB if it is still wider than the plot.
+    Returns `(level_name, frame)` with `bucket, mean, min, max, count` columns.
+    """
+    chosen = None
+    for name, level in pyramid:
+        if date_range is not None:
+            start, end = date_range
+            mask = pd.Series(True, index=level.index)
+            if start is not None:
+                mask &= level['bucket'] >= start
+            if end is not None:
+                mask &= level['bucket'] <= end
+            level = level[mask]
+        chosen = (name, level)
+        if len(level) <= width_px:
+            break
+
+    name, level = chosen
+    if len(level) > width_px:
+        x = level['bucket']
+        x = x.astype('int64') if np.issubdtype(x.dtype, np.datetime64) else x
+        level = level.iloc[lttb(x.to_numpy(), level['mean'].to_numpy(), width_px)]
+    return name, level.reset_index(drop=True)
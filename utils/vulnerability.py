@@ -0,0 +1,135 @@
+import threading
+from pathlib import Path
+import pandas as pd
+from utils.geo_service import get_layer, get_local_units
+
+# Climate-vulnerability layers shipped in data/raster_data (EPSG:4326)
+RASTER_DIR = Path(__file__).resolve().parent.parent / "data" / "raster_data"
+ADMIN_REGIONS_PATH = RASTER_DIR / "nepal_admin_regions.gpkg"
+GLACIERS_PATH = RASTER_DIR / "nepal_glaciers.gpkg"
+RIVERS_PATH = RASTER_DIR / "nepal_rivers.gpkg"
+REGION_COL = 'name'
+# Lengths, areas and distances are measured in UTM zone 45N (metres)
+METRIC_CRS = "EPSG:32645"
+
+_features = {}
+_features_lock = threading.Lock()
+
+
+def glaciers_per_region(regions, glaciers):
+    """
+    Count glaciers in each region and average their retreat rates.
+
+    `regions` and `glaciers` are GeoDataFrames in the same CRS; the
+    point-in-polygon test runs as one bulk query on the regions' index.
+    """
+    glacier_idx, region_idx = regions.sindex.query(glaciers.geometry, predicate='within')
+    numeric = glaciers.drop(columns='geometry').select_dtypes(include='number')
+    joined = numeric.iloc[glacier_idx].set_axis(region_idx)
+    stats = joined.groupby(level=0).mean().add_prefix('glacier_mean_')
+    stats.insert(0, 'glacier_count', joined.groupby(level=0).size())
+    stats = stats.reindex(range(len(regions)))
+    stats['glacier_count'] = stats['glacier_count'].fillna(0).astype(int)
+    return stats.set_axis(regions.index)
+
+
+def rivers_per_region(regions, rivers, metric_crs=METRIC_CRS):
+    """
+    Length of river inside each region and the flow change it carries.
+
+    Line rivers are clipped and measured directly. Polygon rivers (as
+    shipped) are clipped by area; their length is the overlap area divided
+    by the river's mean width (area / half perimeter). Flow columns are
+    averaged weighted by the length inside the region.
+    """
+    regions_m = regions.to_crs(metric_crs)
+    rivers_m = rivers.to_crs(metric_crs)
+    river_idx, region_idx = regions_m.sindex.query(rivers_m.geometry, predicate='intersects')
+
+    pieces = rivers_m.geometry.iloc[river_idx].intersection(regions_m.geometry.iloc[region_idx], align=False)
+    if (rivers_m.geom_type.isin(['Polygon', 'MultiPolygon'])).all():
+        mean_width = rivers_m.area / (rivers_m.length / 2)
+        length = pieces.area.to_numpy() / mean_width.iloc[river_idx].to_numpy()
+    else:
+        length = pieces.length.to_numpy()
+
+    numeric = rivers.drop(columns='geometry').select_dtypes(include='number')
+    weighted = numeric.iloc[river_idx].mul(length, axis=0).set_axis(region_idx)
+    total_length = pd.Series(length, index=region_idx).groupby(level=0).sum()
+    stats = weighted.groupby(level=0).sum().div(total_length, axis=0).add_prefix('river_mean_')
+    stats.insert(0, 'river_length_km', total_length / 1000)
+    stats.insert(1, 'river_count', pd.Series(river_idx, index=region_idx).groupby(level=0).nunique())
+    stats = stats.reindex(range(len(regions)))
+    stats['river_length_km'] = stats['river_length_km'].fillna(0)
+    stats['river_count'] = stats['river_count'].fillna(0).astype(int)
+    return stats.set_axis(regions.index)
+
+
+def nearest_glacier(units, glaciers, id_col='id', metric_crs=METRIC_CRS):
+    """
+    Return the nearest glacier and its distance (km) for every unit polygon.
+
+    Uses the glaciers' index `nearest` query, so the cost grows with
+    log(glaciers) per unit rather than with every pair.
+    """
+    units_m = units.to_crs(metric_crs)
+    glaciers_m = glaciers.to_crs(metric_crs)
+    (unit_idx, glacier_idx), distance = glaciers_m.sindex.nearest(
+        units_m.geometry, return_all=False, return_distance=True
+    )
+    result = pd.DataFrame(index=units.index, columns=['nearest_glacier', 'nearest_glacier_km'])
+    result.iloc[unit_idx, 0] = glaciers[id_col].to_numpy()[glacier_idx]
+    result.iloc[unit_idx, 1] = distance / 1000
+    return result.astype({'nearest_glacier_km': float})
+
+
+def region_features(regions, glaciers, rivers, region_col=REGION_COL):
+    """Build the per-region vulnerability feature table (one row per region)."""
+    table = regions.drop(columns='geometry').set_index(region_col)
+    area_km2 = regions.to_crs(METRIC_CRS).area.to_numpy() / 1e6
+    table.insert(0, 'area_km2', area_km2)
+    table = table.join(glaciers_per_region(regions, glaciers).set_axis(table.index))
+    table = table.join(rivers_per_region(regions, rivers).set_axis(table.index))
+    table['glaciers_per_1000km2'] = 1000 * table['glacier_count'] / table['area_km2']
+    return table
+
+
+def get_region_features(regions_path=ADMIN_REGIONS_PATH, glaciers_path=GLACIERS_PATH,
+                        rivers_path=RIVERS_PATH):
+    """
+    Return the cached per-region vulnerability feature table.
+
+    Layers are loaded once through geo_service (GeoParquet copy and spatial
+    index); the table is recomputed only when one of the layers changes.
+    """
+    paths = (Path(regions_path), Path(glaciers_path), Path(rivers_path))
+    layers = [get_layer(p) for p in paths]
+    stamp = tuple(repr(sorted(layer.stamp.items())) for layer in layers)
+    with _features_lock:
+        cached = _features.get(paths)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+    table = region_features(*(layer.frame for layer in layers))
+    with _features_lock:
+        _features[paths] = (stamp, table)
+    return table
+
+
+def get_unit_features():
+    """Return the nearest glacier and distance for every local unit."""
+    units = get_local_units()
+    return nearest_glacier(units.frame, get_layer(GLACIERS_PATH).frame).join(units.attributes)
+
+
+def join_region_features(df, region_col, features=None, prefix='region_'):
+    """
+    Add the per-region vulnerability features to `df` as predictors.
+
+    Rows are matched on `df[region_col]` against the region names; the
+    result keeps `df`'s rows and order, so it can go straight into
+    `preprocess_data`/`train_model`.
+    """
+    features = get_region_features() if features is None else features
+    numeric = features.select_dtypes(include='number').add_prefix(prefix)
+    joined = numeric.reindex(df[region_col].to_numpy()).set_axis(df.index)
+    return pd.concat([df, joined], axis=1)